@@ -1,12 +1,27 @@
 import streamlit as st
 import pandas as pd
-import numpy_financial as npf
-from babel.numbers import get_currency_symbol, get_currency_name
-from fpdf import FPDF
 import uuid
-from datetime import datetime, timedelta, date
+from datetime import datetime, date
 import streamlit_authenticator as stauth
-import bcrypt
+import numpy as np
+import altair as alt
+import time
+from finance.cache import ResultCache, cached_calculate_schedule, result_key as inputs_key
+from finance.incremental import IncrementalSchedule
+from finance.report import ReportBuilder, report_key
+from finance.export import EXPORT_FORMATS, export_bytes, export_key, frame_key
+from finance import currency
+from finance import display
+from finance import dates as date_rules
+from finance.cashflows import schedule_metrics
+from finance.goalseek import GOAL_VARIABLES, GOAL_METRICS, goal_seek
+from finance.scenarios import ScenarioStore
+from finance.users import UserStore, LoginService, ADMIN_USERS
+from finance import timing
+from finance.charts import BUCKETS as CHART_BUCKETS, BAR_POINT_BUDGET, chart_frames
+from finance.overlay import OVERLAY_VIEWS, align_schedules
+from finance.sensitivity import SWEEP_PARAMETERS, iter_sweep, sweep_frame
+from finance.montecarlo import RATE_MODELS, simulate, summarize
 
 # ==========================================
 # 1. SETUP & PAGE CONFIG
@@ -21,28 +36,22 @@ st.set_page_config(
 # 2. AUTHENTICATION & USER DATABASE
 # ==========================================
 
-# Helper function to hash passwords
-def hash_pass(password):
-    return bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
-
-# Initialize User Database in Session State (Simulating a DB)
-if 'user_db' not in st.session_state:
-    st.session_state.user_db = {
-        'jsmith': {
-            'name': 'John Smith',
-            'password': hash_pass('abc')
-        },
-        'rbriggs': {
-            'name': 'Rebecca Briggs',
-            'password': hash_pass('def')
-        }
-    }
+# Users live in a SQLite store whose (precomputed) hashes are loaded once per process;
+# bcrypt runs on the login service's bounded worker pool with per-user rate limiting.
+@st.cache_resource
+def get_login_service():
+    return LoginService(UserStore())
+
+login_service = get_login_service()
+LOGIN_ERRORS = {
+    'invalid': 'Username/password is incorrect',
+    'rate_limited': 'Too many login attempts. Please wait a minute and try again.',
+    'busy': 'The server is busy. Please try again in a moment.',
+}
 
-# Build the Config Dictionary from our Session State DB
+# Build the Config Dictionary from the User Store
 config = {
-    'credentials': {
-        'usernames': st.session_state.user_db
-    },
+    'credentials': login_service.store.credentials(),
     'cookie': {
         'expiry_days': 30,
         'key': 'random_signature_key',
@@ -53,23 +62,44 @@ config = {
     }
 }
 
-# Initialize Authenticator
+# Initialize Authenticator (hashes are already computed, so skip its auto-hash pass)
 authenticator = stauth.Authenticate(
     config['credentials'],
     config['cookie']['name'],
     config['cookie']['key'],
-    config['cookie']['expiry_days']
+    config['cookie']['expiry_days'],
+    auto_hash=False
 )
 
 # --- LOGIN / SIGNUP TABS ---
+if st.session_state["authentication_status"] is not True:
+    # Restores a session from the re-authentication cookie without rendering a form
+    authenticator.login(location='unrendered')
+
 if st.session_state["authentication_status"] is not True:
     # Create tabs for cleaner UI
     tab_login, tab_signup = st.tabs(["Login", "Create Account"])
     
     with tab_login:
-        authenticator.login()
+        with st.form("login_form"):
+            st.subheader("Login")
+            login_user = st.text_input("Username", autocomplete="off").strip().lower()
+            login_pass = st.text_input("Password", type="password", autocomplete="off")
+            login_submitted = st.form_submit_button("Login")
+
+        if login_submitted and login_user:
+            outcome = login_service.verify(login_user, login_pass)
+            if outcome == "ok":
+                st.session_state["authentication_status"] = True
+                st.session_state["username"] = login_user
+                st.session_state["name"] = login_service.store.get(login_user)['name']
+                authenticator.cookie_controller.set_cookie()
+                st.rerun()
+            st.session_state["authentication_status"] = False
+            st.session_state["login_error"] = LOGIN_ERRORS[outcome]
+
         if st.session_state["authentication_status"] is False:
-            st.error('Username/password is incorrect')
+            st.error(st.session_state.get("login_error", LOGIN_ERRORS["invalid"]))
         elif st.session_state["authentication_status"] is None:
             st.warning('Please enter your credentials')
 
@@ -77,23 +107,20 @@ if st.session_state["authentication_status"] is not True:
         st.subheader("New User Registration")
         with st.form("signup_form"):
             new_name = st.text_input("Full Name")
-            new_user = st.text_input("Username")
+            new_user = st.text_input("Username").strip().lower()
             new_pass = st.text_input("Password", type="password")
             submitted = st.form_submit_button("Create Account")
             
             if submitted:
-                if new_user in st.session_state.user_db:
+                if new_user in login_service.store:
                     st.error("Username already exists!")
                 elif not new_user or not new_pass:
                     st.error("Please fill in all fields.")
-                else:
-                    # Add to our "Database"
-                    st.session_state.user_db[new_user] = {
-                        'name': new_name,
-                        'password': hash_pass(new_pass)
-                    }
+                elif login_service.register(new_user, new_name, new_pass):
                     st.success("Account created! Go to the Login tab to sign in.")
                     # We don't rerun immediately so the user sees the success message
+                else:
+                    st.error("Could not create the account. Please try again.")
     
     # STOP APP HERE IF NOT LOGGED IN
     st.stop()
@@ -108,13 +135,43 @@ with st.sidebar:
     authenticator.logout('Logout', 'main')
     st.divider()
 
+# --- SCENARIO STORE (SQLITE, SHARED BY ALL SESSIONS) ---
+@st.cache_resource
+def get_scenario_store():
+    return ScenarioStore()
+
+scenario_store = get_scenario_store()
+current_user = st.session_state['username']
+SIDEBAR_PAGE_SIZE = 10
+
+# --- TIMING SPANS (PER SESSION + PER PROCESS, JSON-LINES LOG) ---
+@st.cache_resource
+def get_process_timings():
+    return timing.SpanStats(log_path=timing.DEFAULT_LOG_PATH)
+
+process_timings = get_process_timings()
+if 'session_timings' not in st.session_state:
+    st.session_state.session_timings = timing.SpanStats()
+    st.session_state.session_id = uuid.uuid4().hex[:8]
+timing.activate(process_timings, st.session_state.session_timings,
+                user=current_user, session=st.session_state.session_id)
+rerun_started = time.perf_counter()
+
+# An opt-in profile covers exactly one rerun; one left running by an interrupted rerun is closed here
+if st.session_state.get('active_profile') is not None:
+    st.session_state.last_profile = st.session_state.active_profile.export()
+    st.session_state.active_profile = None
+if st.session_state.pop('profile_next_rerun', False):
+    st.session_state.active_profile = timing.Profile()
+    st.session_state.active_profile.start()
+
 # --- INITIALIZE SESSION STATE ---
-if 'saved_scenarios' not in st.session_state:
-    st.session_state.saved_scenarios = []
 if 'current_results' not in st.session_state:
     st.session_state.current_results = None
 if 'grid_key' not in st.session_state:
     st.session_state.grid_key = str(uuid.uuid4())
+if 'incremental_engine' not in st.session_state:
+    st.session_state.incremental_engine = IncrementalSchedule()
 
 # Default Grid Data
 default_grid_data = pd.DataFrame([
@@ -147,166 +204,68 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-ACTIVE_CURRENCIES = ['USD', 'EUR', 'GBP', 'JPY', 'CNY', 'AED', 'SAR', 'CAD', 'AUD', 'CHF', 'INR', 'RUB', 'TRY', 'ZAR']
-
-def format_currency_label(code):
-    try:
-        symbol = get_currency_symbol(code, locale='en_US')
-        name = get_currency_name(code, locale='en_US')
-        return f"{code} ({symbol}) - {name}"
-    except:
-        return code
-
 # ==========================================
 # 4. PDF GENERATOR
 # ==========================================
-class PDF(FPDF):
-    def header(self):
-        self.set_font('Arial', 'B', 14)
-        self.cell(0, 10, 'INVESTMENT ANALYSIS REPORT', 0, 1, 'C')
-        self.ln(5)
-    def footer(self):
-        self.set_y(-15)
-        self.set_font('Arial', 'I', 8)
-        self.cell(0, 10, f'Page {self.page_no()}', 0, 0, 'C')
-
-def create_pdf(project_name, currency_symbol, t_cost, t_int, npv, price, down, df_schedule, start_date):
-    pdf = PDF()
-    pdf.add_page()
-    pdf.set_font("Arial", size=11)
-    
-    pdf.set_font("Arial", 'B', 12)
-    pdf.cell(0, 10, f"PROJECT: {project_name}", 0, 1)
-    pdf.set_font("Arial", 'I', 10)
-    pdf.cell(0, 10, f"Start Date: {start_date.strftime('%B %d, %Y')}", 0, 1)
-    pdf.ln(5)
-    
-    pdf.set_fill_color(250, 250, 250)
-    pdf.set_font("Arial", '', 10)
-    pdf.cell(95, 8, f"Property Price: {currency_symbol}{price:,.0f}", 1, 0, 'L', 1)
-    pdf.cell(95, 8, f"Down Payment: {currency_symbol}{down:,.0f}", 1, 1, 'L', 1)
-    
-    pdf.set_font("Arial", 'B', 10)
-    pdf.cell(63, 10, f"TOTAL COST: {currency_symbol}{t_cost:,.0f}", 1, 0, 'L')
-    pdf.cell(63, 10, f"TOTAL INTEREST: {currency_symbol}{t_int:,.0f}", 1, 0, 'L')
-    pdf.cell(64, 10, f"NPV: {currency_symbol}{npv:,.0f}", 1, 1, 'L')
-    pdf.ln(10)
-    
-    pdf.set_font("Arial", 'B', 11)
-    pdf.cell(0, 10, "PAYMENT SCHEDULE", 0, 1)
-    
-    pdf.set_font("Arial", 'B', 9)
-    pdf.cell(30, 8, "Date", 1)
-    pdf.cell(40, 8, "Payment", 1)
-    pdf.cell(40, 8, "Interest", 1)
-    pdf.cell(40, 8, "Principal", 1)
-    pdf.ln()
-    
-    pdf.set_font("Arial", '', 9)
-    for index, row in df_schedule.head(30).iterrows():
-        date_str = row['Payment Date'].strftime('%b %Y')
-        pdf.cell(30, 7, date_str, 1)
-        pdf.cell(40, 7, f"{row['Payment']:,.0f}", 1)
-        pdf.cell(40, 7, f"{row['Interest']:,.0f}", 1)
-        pdf.cell(40, 7, f"{row['Principal']:,.0f}", 1)
-        pdf.ln()
-        
-    return pdf.output(dest='S').encode('latin-1')
+# Reports cover the whole schedule and are built on a background worker only when requested.
+# Finished bytes are kept in the shared result cache under a key derived from the result hash.
+@st.cache_resource
+def get_report_builder():
+    return ReportBuilder(get_result_cache())
+
+def pdf_report_panel(pdf_key, report_args, file_name):
+    # Polls once a second only while a build is running; the app reruns once when a build starts
+    # or stops so polling is switched on or off.
+    polling = get_report_builder().status(pdf_key) == "running"
+    st.fragment(pdf_report_body, run_every=1 if polling else None)(pdf_key, report_args, file_name, polling)
+
+def pdf_report_body(pdf_key, report_args, file_name, polling):
+    builder = get_report_builder()
+    if builder.status(pdf_key) in (None, "failed"):
+        if st.button("GENERATE PDF REPORT", use_container_width=True):
+            builder.request(pdf_key, *report_args)
+    status = builder.status(pdf_key)
+    if (status == "running") != polling:
+        st.rerun()
+    pdf_bytes = builder.result(pdf_key) if status == "ready" else None
+    if pdf_bytes is not None:
+        st.download_button("DOWNLOAD PDF REPORT", pdf_bytes, file_name, "application/pdf", use_container_width=True)
+    elif status == "running":
+        st.caption("BUILDING PDF REPORT IN THE BACKGROUND...")
+    elif status == "failed":
+        st.caption("PDF REPORT FAILED TO BUILD. CLICK TO RETRY.")
 
 # ==========================================
 # 5. CALCULATION ENGINE
 # ==========================================
-def calculate_schedule(price, down_payment, discount_rate, phases_df, start_date):
-    freq_map = {'Daily': 365, 'Weekly': 52, 'Bi-Weekly': 26, 'Monthly': 12, 
-                'Bi-Monthly': 6, 'Quarterly': 4, 'Semi-Annually': 2, 'Annually': 1,
-                'Specific Date': 0}
-    
-    current_balance = price - down_payment
-    schedule = []
-    cash_flows_npv = [-down_payment]
-    
-    current_date = pd.to_datetime(start_date)
-    
-    for index, row in phases_df.iterrows():
-        if current_balance <= 0.1: break
-
-        freq_type = row['Frequency']
-        rate_annual = row['Interest Rate %'] / 100
-        
-        payment_pct = row.get('Payment %', 0.0)
-        fixed_payment = row.get('Fixed Payment', 0.0)
-        
-        calculated_payment = 0.0
-        is_fixed_input = False
-        
-        if payment_pct > 0:
-            calculated_payment = price * (payment_pct / 100)
-            is_fixed_input = True
-        elif fixed_payment > 0:
-            calculated_payment = fixed_payment
-            is_fixed_input = True
-        
-        # --- PATH A: SPECIFIC DATE ---
-        if freq_type == 'Specific Date':
-            target_date = pd.to_datetime(row['Target Date'])
-            if pd.isna(target_date): continue 
-            
-            days_diff = (target_date - current_date).days
-            if days_diff < 0: days_diff = 0
-            years_diff = days_diff / 365.25
-            
-            interest_amount = current_balance * rate_annual * years_diff
-            
-            if is_fixed_input:
-                payment = calculated_payment
-            else:
-                payment = current_balance + interest_amount
-
-            principal = payment - interest_amount
-            current_balance -= principal
-            
-            schedule.append({
-                "Phase": f"Phase {index + 1}", "Payment Date": target_date,
-                "Payment": payment, "Interest": interest_amount, "Principal": principal, "Balance": max(0, current_balance)
-            })
-            cash_flows_npv.append(-payment)
-            current_date = target_date
-
-        # --- PATH B: STANDARD FREQUENCY ---
-        else:
-            if pd.isna(row['Years']) or row['Years'] <= 0: continue
-            
-            n_per_year = freq_map[freq_type]
-            rate_per_period = rate_annual / n_per_year
-            total_periods = int(row['Years'] * n_per_year)
-            
-            if is_fixed_input:
-                payment = calculated_payment
-            else:
-                if rate_annual == 0: 
-                    payment = current_balance / total_periods
-                else: 
-                    payment = (current_balance * rate_per_period) / (1 - (1 + rate_per_period)**(-total_periods))
-
-            for p in range(1, total_periods + 1):
-                interest = current_balance * rate_per_period
-                principal = payment - interest
-                current_balance -= principal
-                
-                days_to_add = int(365.25 / n_per_year)
-                current_date = current_date + timedelta(days=days_to_add)
-                
-                schedule.append({
-                    "Phase": f"Phase {index + 1}", "Payment Date": current_date,
-                    "Payment": payment, "Interest": interest, "Principal": principal, "Balance": max(0, current_balance)
-                })
-                cash_flows_npv.append(-payment)
-
-    df_schedule = pd.DataFrame(schedule)
-    npv = 0 if len(cash_flows_npv) == 0 else npf.npv(discount_rate/100/12, cash_flows_npv)
-    t_paid = df_schedule['Payment'].sum() + down_payment if not df_schedule.empty else down_payment
-    t_int = df_schedule['Interest'].sum() if not df_schedule.empty else 0
-    return df_schedule, t_paid, t_int, npv
+# Runs go through each session's finance.incremental.IncrementalSchedule (array-backed, see
+# finance.engine.calculate_schedule_vectorized); finance.engine.calculate_schedule is the per-period
+# reference both are tested against under tests/.
+
+# Results are keyed on a hash of the inputs and shared by every session in this server process
+@st.cache_resource
+def get_result_cache():
+    return ResultCache(max_bytes=256 * 1024 * 1024)
+
+result_cache = get_result_cache()
+
+# Downloads are built only when clicked (off the script thread) and kept in the result cache under the result hash
+def deferred_export(key, frames, fmt, **options):
+    return lambda: result_cache.get_or_compute(export_key(key, fmt), lambda: export_bytes(frames, fmt, **options),
+                                               counted=False)
+
+def export_format_label(fmt):
+    return EXPORT_FORMATS[fmt]["label"]
+
+# Stored schedules are decoded once per process and kept in the result cache by scenario id
+# (ids are never reused); returns {id: (inputs, schedule_df)} for the ids that have one
+def stored_schedules(username, scenario_ids):
+    keys = {i: f"schedule:{username}:{i}" for i in scenario_ids}
+    found = {i: result_cache.get(k, counted=False) for i, k in keys.items()}
+    missing = [i for i, v in found.items() if v is None]
+    for i, value in scenario_store.load_schedules(username, missing).items():
+        found[i] = result_cache.put(keys[i], value)
+    return {i: v for i, v in found.items() if v is not None}
 
 # ==========================================
 # 6. SIDEBAR - SCENARIO MANAGER
@@ -321,40 +280,75 @@ with st.sidebar:
         st.rerun()
 
     st.markdown("---")
-    view_mode = st.radio("VIEW MODE", ["CALCULATOR", "COMPARISON"], index=0, label_visibility="collapsed")
+    view_mode = st.radio("VIEW MODE", ["CALCULATOR", "COMPARISON", "SENSITIVITY", "SIMULATION"], index=0, label_visibility="collapsed")
     st.markdown("---")
     
-    if st.session_state.saved_scenarios:
+    saved_count = scenario_store.count(current_user)
+    if saved_count:
         st.subheader("SAVED SCENARIOS")
         st.caption("CLICK 'LOAD' TO RESTORE VARIABLES")
-        for i, scen in enumerate(st.session_state.saved_scenarios):
+        sidebar_pages = -(-saved_count // SIDEBAR_PAGE_SIZE)
+        sidebar_page = st.number_input("PAGE", min_value=1, max_value=sidebar_pages, value=1, key="scenario_page") if sidebar_pages > 1 else 1
+        recent = scenario_store.list(current_user, limit=SIDEBAR_PAGE_SIZE, offset=(sidebar_page - 1) * SIDEBAR_PAGE_SIZE)
+        for scen in recent.to_dict('records'):
             c1, c2 = st.columns([3, 1])
             with c1:
                 st.markdown(f"**{scen['name']}**")
-                curr = scen.get('currency_symbol', '$') 
-                cost = scen.get('cost', 0)
-                st.caption(f"{curr}{cost:,.0f}")
+                st.caption(f"{scen['currency_symbol']}{scen['cost']:,.0f}")
             with c2:
-                if st.button("LOAD", key=f"load_{i}"):
-                    st.session_state.proj_name_input = scen['inputs']['project_name']
-                    st.session_state.currency_input = scen['inputs']['currency_code']
-                    st.session_state.start_date_input = scen['inputs']['start_date']
-                    st.session_state.price_input = scen['inputs']['price']
-                    st.session_state.down_input = scen['inputs']['down_payment']
-                    st.session_state.disc_input = scen['inputs']['discount_rate']
-                    st.session_state.active_grid_df = scen['inputs']['grid_df']
+                if st.button("LOAD", key=f"load_{scen['id']}"):
+                    inputs = scenario_store.load(current_user, scen['id'])['inputs']
+                    st.session_state.proj_name_input = inputs['project_name']
+                    st.session_state.currency_input = inputs['currency_code']
+                    st.session_state.start_date_input = inputs['start_date']
+                    st.session_state.price_input = inputs['price']
+                    st.session_state.down_input = inputs['down_payment']
+                    st.session_state.disc_input = inputs['discount_rate']
+                    loaded_conventions = inputs.get('conventions') or {}
+                    st.session_state.anchor_input = loaded_conventions.get('anchor', 'legacy')
+                    st.session_state.roll_input = loaded_conventions.get('roll', 'none')
+                    st.session_state.calendar_input = loaded_conventions.get('calendar', 'NONE')
+                    st.session_state.daycount_input = loaded_conventions.get('day_count', 'flat')
+                    st.session_state.active_grid_df = inputs['grid_df']
                     st.session_state.grid_key = str(uuid.uuid4())
                     st.success(f"LOADED: {scen['name']}")
                     st.rerun()
         if st.button("CLEAR ALL HISTORY", type="secondary"):
-            st.session_state.saved_scenarios = []
+            scenario_store.delete_all(current_user)
             st.rerun()
         st.markdown("---")
 
+    if current_user in ADMIN_USERS:
+        with st.expander("PERFORMANCE (ADMIN)"):
+            st.caption("ROLLING TIMINGS UP TO THE PREVIOUS RERUN")
+            session_summary = st.session_state.session_timings.summary()
+            process_summary = process_timings.summary()
+            if process_summary:
+                perf_df = pd.DataFrame({
+                    "SESSION P50": {k: v["p50_ms"] for k, v in session_summary.items()},
+                    "SESSION P95": {k: v["p95_ms"] for k, v in session_summary.items()},
+                    "PROCESS P50": {k: v["p50_ms"] for k, v in process_summary.items()},
+                    "PROCESS P95": {k: v["p95_ms"] for k, v in process_summary.items()},
+                    "PROCESS N": {k: v["count"] for k, v in process_summary.items()},
+                })
+                st.dataframe(perf_df, use_container_width=True, column_config={
+                    c: st.column_config.NumberColumn(c, format="%.1f ms") for c in perf_df.columns if c != "PROCESS N"
+                })
+            st.caption(f"LOG: {timing.DEFAULT_LOG_PATH}")
+            if st.button("PROFILE NEXT RERUN", type="secondary"):
+                st.session_state.profile_next_rerun = True
+                st.rerun()
+            if st.session_state.get('last_profile'):
+                profile_bytes, profile_name, profile_mime = st.session_state.last_profile
+                st.download_button("DOWNLOAD PROFILE", profile_bytes, profile_name, profile_mime, use_container_width=True)
+
     with st.expander("1. CURRENCY & SETTINGS", expanded=True):
-        default_idx = ACTIVE_CURRENCIES.index('USD') if 'USD' in ACTIVE_CURRENCIES else 0
-        currency_code = st.selectbox("Currency", ACTIVE_CURRENCIES, index=default_idx, format_func=format_currency_label, key='currency_input')
-        currency_symbol = get_currency_symbol(currency_code, locale='en_US')
+        number_locale = st.selectbox("Number Format", currency.LOCALES, format_func=currency.locale_label, key='locale_input',
+                                     help="Separators, symbol placement and currency names used in figures and tables.")
+        default_idx = currency.ACTIVE_CURRENCIES.index('USD') if 'USD' in currency.ACTIVE_CURRENCIES else 0
+        currency_code = st.selectbox("Currency", currency.ACTIVE_CURRENCIES, index=default_idx,
+                                     format_func=currency.currency_labels(number_locale).get, key='currency_input')
+        currency_symbol = currency.currency_symbol(currency_code, number_locale)
         project_name = st.text_input("Project Name", "Project Alpha", key='proj_name_input')
         start_date = st.date_input("Start Date", datetime.today(), key='start_date_input')
 
@@ -363,9 +357,30 @@ with st.sidebar:
         down_payment = st.number_input(f"Down Payment ({currency_symbol})", value=200000.0, step=5000.0, key='down_input')
         discount_rate = st.number_input("Inflation / Discount Rate (%)", value=5.0, step=0.1, format="%.2f", key='disc_input')
 
+    with st.expander("3. DATE CONVENTIONS", expanded=False):
+        date_anchor = st.selectbox("Payment Dates", list(date_rules.ANCHORS), format_func=date_rules.ANCHORS.get, key='anchor_input',
+                                   help="Calendar months pinned to the start day (or month end) instead of 365.25/N-day steps.")
+        date_roll = st.selectbox("Business Day Roll", list(date_rules.ROLLS), format_func=date_rules.ROLLS.get, key='roll_input')
+        holiday_calendar = st.selectbox("Holiday Calendar", list(date_rules.CALENDARS), format_func=date_rules.CALENDARS.get,
+                                        key='calendar_input', disabled=date_roll == "none")
+        day_count = st.selectbox("Day Count", list(date_rules.DAY_COUNTS), format_func=date_rules.DAY_COUNTS.get, key='daycount_input',
+                                 help="Accrue each period on the actual days between payments instead of rate / periods per year.")
+        conventions = date_rules.make_conventions(date_anchor, date_roll, holiday_calendar, day_count)
+
 # ==========================================
 # 7. MAIN DASHBOARD LOGIC
 # ==========================================
+# Tables stay numeric and the grid formats them when the locale fits a printf format;
+# otherwise whole columns are formatted at once (finance.display). Returns (frame, column_config).
+def table_view(df, amount_columns, symbol="", date_columns=(), percent_columns=()):
+    amount_format = display.column_formats(symbol, number_locale)
+    if amount_format:
+        config = {c: st.column_config.NumberColumn(c, format=amount_format) for c in amount_columns}
+        config.update({c: st.column_config.DateColumn(c, format=display.COLUMN_DATE_FORMAT) for c in date_columns})
+        config.update({c: st.column_config.NumberColumn(c, format="percent") for c in percent_columns})
+        return df, config
+    out = display.display_strings(df, amount_columns, symbol, number_locale, date_columns, percent_columns)
+    return out, {c: st.column_config.TextColumn(c, alignment="right") for c in list(amount_columns) + list(percent_columns)}
 
 if view_mode == "CALCULATOR":
     st.title(f"REAL ESTATE STRUCTURE: {project_name}")
@@ -410,14 +425,82 @@ if view_mode == "CALCULATOR":
         run_pressed = st.button("RUN ANALYSIS", type="primary")
 
     if run_pressed:
-        df, t_paid, t_int, npv = calculate_schedule(price, down_payment, discount_rate, edited_phases, start_date)
-        st.session_state.current_results = {'df': df, 't_paid': t_paid, 't_int': t_int, 'npv': npv}
+        with timing.span("dashboard.calculate"):
+            result_key, (df, t_paid, t_int, npv) = cached_calculate_schedule(
+                result_cache, price, down_payment, discount_rate, edited_phases, start_date,
+                engine=st.session_state.incremental_engine.calculate, conventions=conventions
+            )
+        with timing.span("dashboard.xirr"):
+            (xnpv,), (xirr,) = schedule_metrics([df], [price], [down_payment], [discount_rate], [start_date])
+        st.session_state.current_results = {'df': df, 't_paid': t_paid, 't_int': t_int, 'npv': npv, 'key': result_key,
+                                            'xnpv': xnpv, 'xirr': xirr}
         st.session_state.active_grid_df = edited_phases
 
+    with col_btn2:
+        # Only RUN ANALYSIS lookups are counted; exports, overlays and goal seek share the cache uncounted
+        cache_stats = result_cache.stats()
+        st.caption(f"RESULT CACHE: {cache_stats['hits']} HITS / {cache_stats['misses']} MISSES | "
+                   f"{cache_stats['entries']} ENTRIES ({cache_stats['bytes'] / 1024**2:.1f} MB)")
+
+    # GOAL SEEK: solve one input for a target metric; the answer is only applied on request
+    def apply_goal_solution(solution):
+        st.session_state.active_grid_df = solution['grid']
+        st.session_state.grid_key = str(uuid.uuid4())
+        if solution['variable'] == "Down Payment":
+            st.session_state.down_input = solution['down_payment']
+        st.session_state.current_results = None
+        st.session_state.goal_solution = None
+
+    with st.expander("GOAL SEEK"):
+        st.caption("SOLVE ONE INPUT SO A SCHEDULE METRIC HITS A TARGET, E.G. A MONTHLY PAYMENT OF AT MOST X.")
+        g1, g2, g3, g4 = st.columns(4)
+        goal_variable = g1.selectbox("SOLVE FOR", list(GOAL_VARIABLES), key="goal_variable",
+                                     help=" ".join(f"{k}: {v['help']}" for k, v in GOAL_VARIABLES.items()))
+        goal_row = None
+        if GOAL_VARIABLES[goal_variable]["row"]:
+            goal_rows = [i for i in edited_phases.index
+                         if goal_variable != "Years" or edited_phases.loc[i, "Frequency"] != "Specific Date"]
+            goal_row = g2.selectbox("PHASE", goal_rows, format_func=lambda i: f"PHASE {i + 1}", key="goal_row")
+        goal_metric = g3.selectbox("TARGET METRIC", list(GOAL_METRICS), key="goal_metric",
+                                   help=" ".join(f"{k}: {v}" for k, v in GOAL_METRICS.items()))
+        goal_target = g4.number_input(f"TARGET ({currency_symbol})", min_value=0.0, value=10000.0, step=1000.0, key="goal_target")
+
+        goal_basis = inputs_key(price, down_payment, discount_rate, edited_phases, start_date, conventions)
+        if st.button("SOLVE", type="secondary", disabled=GOAL_VARIABLES[goal_variable]["row"] and goal_row is None):
+            try:
+                with timing.span("dashboard.goalseek"):
+                    solution = goal_seek(goal_variable, goal_metric, goal_target, price, down_payment, discount_rate,
+                                         edited_phases, start_date, row_index=goal_row, cache=result_cache,
+                                         conventions=conventions)
+                st.session_state.goal_solution = {**solution, 'basis': goal_basis, 'row': goal_row}
+            except (KeyError, TypeError, ValueError) as e:
+                st.session_state.goal_solution = None
+                st.error(f"GOAL SEEK FAILED: {e}")
+
+        solution = st.session_state.get('goal_solution')
+        if solution and solution['basis'] == goal_basis:
+            if solution['variable'] == "Years":
+                value_text = f"{solution['years']:.2f} YRS ({solution['value']} PAYMENTS)"
+            elif solution['variable'] == "Payment %":
+                value_text = f"{solution['value']:.2f}%"
+            else:
+                value_text = f"{currency_symbol}{solution['value']:,.2f}"
+            where = "" if solution['row'] is None else f" ON PHASE {solution['row'] + 1}"
+            answer = (f"{solution['variable'].upper()}{where} = {value_text} GIVES {solution['metric'].upper()} "
+                      f"{currency_symbol}{solution['achieved']:,.2f}")
+            if solution['status'] == "solved":
+                st.success(answer)
+            else:
+                low, high = solution['range']
+                st.warning(f"TARGET OUT OF REACH: {solution['metric'].upper()} RANGES FROM {currency_symbol}{low:,.0f} "
+                           f"TO {currency_symbol}{high:,.0f}. CLOSEST: {answer}")
+            st.caption(f"{solution['evaluations']} ENGINE RUNS IN {solution['seconds'] * 1000:.0f} MS")
+            st.button("APPLY TO INPUTS", type="primary", on_click=apply_goal_solution, args=(solution,))
+
     if st.session_state.current_results:
         res = st.session_state.current_results
         df, t_paid, t_int, npv = res['df'], res['t_paid'], res['t_int'], res['npv']
-        def fmt(val): return f"{currency_symbol}{val:,.0f}"
+        def fmt(val): return display.format_amount(val, currency_symbol, number_locale)
 
         st.markdown("---")
         c1, c2, c3, c4 = st.columns(4)
@@ -425,21 +508,27 @@ if view_mode == "CALCULATOR":
         c2.metric("INTEREST PAID", fmt(t_int))
         c3.metric("NPV (ADJUSTED)", fmt(abs(npv)))
         c4.metric("PAYMENTS", len(df))
+        if 'xirr' in res:
+            x1, x2 = st.columns(2)
+            x1.metric("XNPV (DATED)", fmt(abs(res['xnpv'])),
+                      help="Payments discounted on their actual dates at the discount rate as an annual rate (ACT/365).")
+            x2.metric("EFFECTIVE RATE (XIRR)", "N/A" if np.isnan(res['xirr']) else f"{res['xirr']:.2%}",
+                      help="Annual rate at which the payments repay the financed amount (price less down payment).")
 
         st.write("##")
         if st.button("SAVE SNAPSHOT TO COMPARE"):
-            scenario = {
-                "name": f"{project_name} ({pd.Timestamp.now().strftime('%H:%M:%S')})",
-                "cost": t_paid, "interest": t_int, "npv": abs(npv),
-                "currency_symbol": currency_symbol,
-                "inputs": {
+            scenario_store.save(
+                current_user, f"{project_name} ({pd.Timestamp.now().strftime('%H:%M:%S')})",
+                cost=t_paid, interest=t_int, npv=abs(npv),
+                currency=currency_code, currency_symbol=currency_symbol,
+                inputs={
                     "project_name": project_name, "currency_code": currency_code,
                     "start_date": start_date, "price": price,
                     "down_payment": down_payment, "discount_rate": discount_rate,
-                    "grid_df": edited_phases
-                }
-            }
-            st.session_state.saved_scenarios.append(scenario)
+                    "conventions": conventions,
+                },
+                grid_df=edited_phases, schedule_df=df, xnpv=res.get('xnpv'), xirr=res.get('xirr')
+            )
             st.success("SNAPSHOT SAVED WITH FULL DATA. CLICK 'LOAD' IN SIDEBAR TO RESTORE.")
             st.rerun()
 
@@ -448,40 +537,75 @@ if view_mode == "CALCULATOR":
         
         with tab1:
             if not df.empty:
-                st.subheader("TIMELINE: PRINCIPAL VS INTEREST")
-                chart_data = df.set_index("Payment Date")[["Interest", "Principal"]]
-                st.bar_chart(chart_data, color=["#C5A059", "#111111"])
-                st.caption("X-AXIS: CALENDAR DATES | GOLD: INTEREST | BLACK: PRINCIPAL")
+                h1, h2 = st.columns([3, 1])
+                with h1:
+                    st.subheader("TIMELINE: PRINCIPAL VS INTEREST")
+                with h2:
+                    bucket = st.selectbox("AGGREGATION", ["AUTO", "NONE"] + list(CHART_BUCKETS), index=0,
+                                          help=f"AUTO keeps the chart under {BAR_POINT_BUDGET} bars.")
+                with timing.span("dashboard.charts"):
+                    chart_data, balance_data, bucket_used = chart_frames(df, bucket)
+                    st.bar_chart(chart_data, color=["#C5A059", "#111111"])
+                st.caption(f"X-AXIS: CALENDAR DATES | GOLD: INTEREST | BLACK: PRINCIPAL | "
+                           f"{len(chart_data):,} BARS FROM {len(df):,} PAYMENTS" + ("" if bucket_used == "NONE" else f" ({bucket_used} TOTALS)"))
+
+                st.subheader("OUTSTANDING BALANCE")
+                with timing.span("dashboard.charts"):
+                    st.line_chart(balance_data, color="#111111")
+                if len(balance_data) < len(df):
+                    st.caption(f"{len(balance_data):,} OF {len(df):,} POINTS (LTTB DOWNSAMPLED)")
 
         with tab2:
-            disp_df = df.copy()
-            disp_df['Payment Date'] = disp_df['Payment Date'].apply(lambda x: x.strftime('%b %d, %Y'))
-            st.dataframe(disp_df, use_container_width=True)
+            with timing.span("dashboard.display_format"):
+                disp_df, disp_config = table_view(df, display.AMOUNT_COLUMNS, currency_symbol, date_columns=["Payment Date"])
+            with timing.span("dashboard.table"):
+                st.dataframe(disp_df, use_container_width=True, column_config=disp_config)
             d1, d2 = st.columns(2)
-            csv = df.to_csv(index=False).encode('utf-8')
-            d1.download_button("DOWNLOAD CSV", csv, f"{project_name}.csv", "text/csv", use_container_width=True)
-            try:
-                pdf_bytes = create_pdf(project_name, currency_symbol, t_paid, t_int, abs(npv), price, down_payment, df, start_date)
-                d2.download_button("DOWNLOAD PDF REPORT", pdf_bytes, f"{project_name}.pdf", "application/pdf", use_container_width=True)
-            except: pass
+            with d1:
+                export_fmt = st.selectbox("EXPORT FORMAT", list(EXPORT_FORMATS), format_func=export_format_label,
+                                          key="schedule_export_format", label_visibility="collapsed")
+                spec = EXPORT_FORMATS[export_fmt]
+                st.download_button(f"DOWNLOAD {spec['label']}", deferred_export(res.get('key'), df, export_fmt),
+                                   f"{project_name}.{spec['extension']}", spec['mime'], use_container_width=True)
+            with d2:
+                pdf_report_panel(
+                    report_key(res.get('key'), project_name, currency_symbol),
+                    (project_name, currency_symbol, t_paid, t_int, abs(npv), price, down_payment, df, start_date),
+                    f"{project_name}.pdf"
+                )
 
 elif view_mode == "COMPARISON":
     st.title("SCENARIO COMPARISON BOARD")
-    if not st.session_state.saved_scenarios:
+    saved_count = scenario_store.count(current_user)
+    if not saved_count:
         st.info("NO SCENARIOS SAVED. PLEASE RUN AN ANALYSIS AND CLICK 'SAVE SNAPSHOT'.")
     else:
         st.caption("COMPARE FINANCIAL METRICS ACROSS SAVED SCENARIOS.")
         if st.button("CLEAR ALL SCENARIOS", type="secondary"):
-            st.session_state.saved_scenarios = []
+            scenario_store.delete_all(current_user)
             st.rerun()
-            
-        comp_data = []
-        for s in st.session_state.saved_scenarios:
-            comp_data.append({
-                "Scenario": s['name'], "Total Cost": s['cost'], "Total Interest": s['interest'], "NPV": s['npv']
-            })
-        df_comp = pd.DataFrame(comp_data).set_index("Scenario")
-        
+
+        sort_options = {
+            "NEWEST FIRST": ("created_at", True), "OLDEST FIRST": ("created_at", False),
+            "LOWEST COST": ("cost", False), "HIGHEST COST": ("cost", True),
+            "LOWEST INTEREST": ("interest", False), "LOWEST NPV": ("npv", False), "NAME": ("name", False),
+        }
+        p1, p2, p3 = st.columns(3)
+        sort_by = p1.selectbox("SORT BY", list(sort_options))
+        page_size = p2.selectbox("PER PAGE", [25, 50, 100, 250], index=1)
+        n_pages = -(-saved_count // page_size)
+        page = p3.number_input("PAGE", min_value=1, max_value=n_pages, value=1)
+        order_by, descending = sort_options[sort_by]
+        page_df = scenario_store.list(current_user, order_by, descending, limit=page_size, offset=(page - 1) * page_size)
+        # XNPV / XIRR are stored at save time; snapshots from before that get them solved once here
+        if scenario_store.backfill_metrics(current_user, page_df.loc[page_df["xnpv"].isna(), "id"]):
+            page_df = scenario_store.list(current_user, order_by, descending, limit=page_size, offset=(page - 1) * page_size)
+        st.caption(f"SHOWING {(page - 1) * page_size + 1}-{(page - 1) * page_size + len(page_df)} OF {saved_count} SCENARIOS")
+
+        df_comp = page_df.rename(columns={
+            "name": "Scenario", "cost": "Total Cost", "interest": "Total Interest", "npv": "NPV", "xnpv": "XNPV", "xirr": "XIRR"
+        }).set_index("Scenario")[["Total Cost", "Total Interest", "NPV", "XNPV", "XIRR"]]
+
         c_chart1, c_chart2 = st.columns(2)
         with c_chart1:
             st.subheader("TOTAL COST COMPARISON")
@@ -491,7 +615,172 @@ elif view_mode == "COMPARISON":
             st.bar_chart(df_comp["Total Interest"], color="#C5A059")
             
         st.subheader("METRICS TABLE")
-        df_disp = df_comp.copy()
-        for c in ["Total Cost", "Total Interest", "NPV"]:
-            df_disp[c] = df_disp[c].apply(lambda x: f"{x:,.0f}")
-        st.dataframe(df_disp, use_container_width=True)
+        df_disp, disp_config = table_view(df_comp, ["Total Cost", "Total Interest", "NPV", "XNPV"], percent_columns=["XIRR"])
+        st.dataframe(df_disp, use_container_width=True, column_config=disp_config)
+
+        e1, e2 = st.columns(2)
+        comp_fmt = e1.selectbox("EXPORT FORMAT", list(EXPORT_FORMATS), format_func=export_format_label,
+                                key="comparison_export_format", label_visibility="collapsed")
+        spec = EXPORT_FORMATS[comp_fmt]
+        df_export = df_comp.reset_index()
+        e2.download_button(f"DOWNLOAD {spec['label']}",
+                           deferred_export(frame_key(df_export), df_export, comp_fmt, sheet_name="Comparison",
+                                           number_formats={"XIRR": "0.00%"}),
+                           f"scenario_comparison.{spec['extension']}", spec['mime'], use_container_width=True)
+
+        # Cash-flow overlay: the chosen stored schedules on one shared calendar index
+        st.subheader("CASH FLOW OVERLAY")
+        dated = page_df.loc[page_df["has_schedule"], "id"].tolist()
+        if not dated:
+            st.info("NO STORED SCHEDULES ON THIS PAGE. SAVE A NEW SNAPSHOT TO OVERLAY ITS CASH FLOWS.")
+        else:
+            scenario_names = dict(zip(page_df["id"], page_df["name"]))
+            overlay_ids = st.multiselect("SCENARIOS", dated, default=dated[:5], format_func=lambda i: f"{scenario_names[i]} #{i}",
+                                         key="overlay_ids")
+            o1, o2, o3 = st.columns(3)
+            overlay_view = o1.selectbox("SHOW", list(OVERLAY_VIEWS), key="overlay_view")
+            overlay_bucket = o2.selectbox("BUCKET", ["AUTO"] + list(CHART_BUCKETS), key="overlay_bucket")
+            overlay_base = o3.selectbox("DIFFERENCE VS", overlay_ids, format_func=lambda i: f"{scenario_names[i]} #{i}",
+                                        key="overlay_base", disabled=OVERLAY_VIEWS[overlay_view] != "difference")
+            if overlay_ids:
+                with timing.span("dashboard.overlay"):
+                    overlay_schedules = stored_schedules(current_user, overlay_ids)
+                    labels = {i: f"{scenario_names[i]} #{i}" for i in overlay_ids}
+                    overlay_inputs = [overlay_schedules[i][0] for i in overlay_ids]
+                    overlay, overlay_freq = align_schedules(
+                        {labels[i]: overlay_schedules[i][1] for i in overlay_ids},
+                        [x["price"] - x["down_payment"] for x in overlay_inputs], [x["down_payment"] for x in overlay_inputs],
+                        baseline=labels.get(overlay_base),
+                        freq=None if overlay_bucket == "AUTO" else CHART_BUCKETS[overlay_bucket],
+                    )
+                    overlay_chart = overlay[OVERLAY_VIEWS[overlay_view]]
+                    if len(overlay_ids) == 1:
+                        # A lone series goes to Altair as a field name, where ':' (saved-at HH:MM:SS) is a type suffix
+                        overlay_chart = overlay_chart.rename(columns=lambda c: c.replace(":", "\\:"))
+                    st.line_chart(overlay_chart)
+                bucket_name = {v: k for k, v in CHART_BUCKETS.items()}[overlay_freq]
+                currencies = set(page_df.loc[page_df["id"].isin(overlay_ids), "currency"])
+                st.caption(f"{len(overlay_ids)} SCENARIOS ON {len(overlay[OVERLAY_VIEWS[overlay_view]])} {bucket_name} BUCKETS"
+                           + (" · MIXED CURRENCIES, AMOUNTS NOT CONVERTED" if len(currencies) > 1 else ""))
+
+elif view_mode == "SENSITIVITY":
+    st.title("SENSITIVITY ANALYSIS")
+    st.caption("SWEEP UP TO THREE INPUTS OVER THE CURRENT PAYMENT GRID (AS OF THE LAST RUN ANALYSIS).")
+
+    sweep_dims = st.multiselect("SWEEP DIMENSIONS", list(SWEEP_PARAMETERS), default=["Interest Rate %", "Down Payment %"], max_selections=3)
+    sweep_axes = {}
+    dim_cols = st.columns(3)
+    for col, name in zip(dim_cols, sweep_dims):
+        lo, hi = SWEEP_PARAMETERS[name]["default"] or (price * 0.8, price * 1.2)
+        with col:
+            st.markdown(f"**{name.upper()}**")
+            st.caption(SWEEP_PARAMETERS[name]["help"])
+            v_from = st.number_input("FROM", value=float(lo), key=f"sweep_from_{name}")
+            v_to = st.number_input("TO", value=float(hi), key=f"sweep_to_{name}")
+            v_steps = st.number_input("STEPS", min_value=2, max_value=100, value=10, step=1, key=f"sweep_steps_{name}")
+        sweep_axes[name] = np.linspace(v_from, v_to, int(v_steps))
+
+    def render_sweep(axes, results, target, live=False):
+        names = list(axes)
+        with target.container():
+            fixed = {}
+            if len(names) == 3 and live:
+                fixed[names[2]] = axes[names[2]][0]
+            elif len(names) == 3:
+                fixed[names[2]] = st.select_slider(names[2].upper(), options=list(axes[names[2]]),
+                                                   format_func=lambda v: f"{v:,.2f}", key="sweep_slice")
+            frame = sweep_frame(axes, results, fixed)
+            frame["npv"] = frame["npv"].abs()
+            metrics = [("total_cost", "TOTAL COST", "greys"), ("total_interest", "TOTAL INTEREST", "goldorange"), ("npv", "NPV (ADJUSTED)", "greys")]
+            chart_cols = st.columns(3)
+            for col, (metric, label, scheme) in zip(chart_cols, metrics):
+                with col:
+                    st.subheader(label)
+                    if len(names) == 1:
+                        st.line_chart(frame.set_index(names[0])[metric], color="#111111")
+                    else:
+                        heat = alt.Chart(frame).mark_rect().encode(
+                            x=alt.X(f"{names[0]}:O", axis=alt.Axis(format=",.2f")),
+                            y=alt.Y(f"{names[1]}:O", axis=alt.Axis(format=",.2f")),
+                            color=alt.Color(f"{metric}:Q", scale=alt.Scale(scheme=scheme), title=label),
+                            tooltip=names + [alt.Tooltip(f"{metric}:Q", format=",.0f")],
+                        )
+                        st.altair_chart(heat, use_container_width=True)
+
+    if sweep_dims and st.button("RUN SWEEP", type="primary"):
+        progress = st.progress(0.0, text="SWEEPING...")
+        live = st.empty()
+        last_draw = 0.0
+        try:
+            for done, results in iter_sweep(price, down_payment, discount_rate, st.session_state.active_grid_df, start_date,
+                                            sweep_axes, conventions=conventions):
+                progress.progress(done, text=f"SWEEPING... {done:.0%}")
+                if time.monotonic() - last_draw > 0.5 and done < 1:
+                    render_sweep(sweep_axes, results, live, live=True)
+                    last_draw = time.monotonic()
+        except Exception as e:
+            st.error(f"SWEEP FAILED: {e}")
+        else:
+            st.session_state.sweep_results = (sweep_axes, results)
+        live.empty()
+        progress.empty()
+
+    if st.session_state.get('sweep_results'):
+        render_sweep(*st.session_state.sweep_results, st.empty())
+
+elif view_mode == "SIMULATION":
+    st.title("INTEREST RATE SIMULATION")
+    st.caption("MONTE CARLO RATE PATHS FOR FLOATING PHASES OF THE CURRENT PAYMENT GRID (AS OF THE LAST RUN ANALYSIS).")
+    if conventions:
+        st.caption("SIMULATED PATHS USE FIXED-STEP DATES AND RATE / PERIODS ACCRUAL; DATE CONVENTIONS DO NOT APPLY HERE.")
+
+    sim_grid = st.session_state.active_grid_df
+    standard_phases = [f"Phase {i + 1}" for i, f in zip(sim_grid.index, sim_grid["Frequency"]) if f != "Specific Date"]
+    floating = st.multiselect("FLOATING PHASES", standard_phases, default=standard_phases,
+                              help="Only standard-frequency phases can float. Payments are re-amortized each period.")
+
+    m1, m2, m3 = st.columns(3)
+    with m1:
+        rate_model = st.selectbox("RATE MODEL", RATE_MODELS)
+        n_paths = st.number_input("PATHS", min_value=100, max_value=200000, value=10000, step=1000)
+    with m2:
+        volatility = st.number_input("VOLATILITY (%)", value=1.0 if rate_model == "Vasicek" else 20.0, step=0.1,
+                                     help="Vasicek: annual points of rate. Lognormal: annual relative volatility.")
+        seed = st.number_input("SEED", min_value=0, value=42, step=1)
+    with m3:
+        mean_reversion = st.number_input("MEAN REVERSION", value=0.1, step=0.05, disabled=rate_model != "Vasicek")
+        long_run_mean = st.number_input("LONG-RUN RATE (%)", value=5.0, step=0.1, disabled=rate_model != "Vasicek")
+
+    if st.button("RUN SIMULATION", type="primary", disabled=not floating):
+        with st.spinner("SIMULATING RATE PATHS..."):
+            sim = simulate(price, down_payment, discount_rate, sim_grid, start_date, floating, n_paths=int(n_paths),
+                           seed=int(seed), model=rate_model, volatility=volatility / 100,
+                           mean_reversion=mean_reversion, long_run_mean=long_run_mean / 100)
+        st.session_state.sim_results = sim
+
+    if st.session_state.get('sim_results'):
+        sim = st.session_state.sim_results
+        summary = summarize(sim)
+        summary["npv"] = summary["npv"].abs()
+        def fmt(val): return display.format_amount(val, currency_symbol, number_locale)
+
+        st.markdown("---")
+        for pct in summary.index:
+            c1, c2, c3 = st.columns(3)
+            c1.metric(f"{pct} TOTAL INTEREST", fmt(summary.loc[pct, "total_interest"]))
+            c2.metric(f"{pct} NPV (ADJUSTED)", fmt(summary.loc[pct, "npv"]))
+            c3.metric(f"{pct} PEAK PAYMENT", fmt(summary.loc[pct, "peak_payment"]))
+
+        st.subheader("TOTAL INTEREST DISTRIBUTION")
+        counts, edges = np.histogram(sim["total_interest"], bins=50)
+        hist = pd.DataFrame({"Total Interest": (edges[:-1] + edges[1:]) / 2, "Paths": counts})
+        st.bar_chart(hist.set_index("Total Interest"), color="#C5A059")
+        st.caption(f"{len(sim['total_interest']):,} PATHS | X-AXIS: TOTAL INTEREST | Y-AXIS: NUMBER OF PATHS")
+
+# ==========================================
+# 8. RERUN TIMING & PROFILE CAPTURE
+# ==========================================
+timing.record("dashboard.rerun", time.perf_counter() - rerun_started, view=view_mode)
+if st.session_state.get('active_profile') is not None:
+    st.session_state.last_profile = st.session_state.active_profile.export()
+    st.session_state.active_profile = None
@@ -0,0 +1,49 @@
+import pandas as pd
+from datetime import date, timedelta
+
+from finance.engine import FREQ_MAP
+
+# ==========================================
+# SYNTHETIC PHASE GRIDS
+# ==========================================
+# Grids are sized by the number of schedule rows they produce. "fixed" grids pay a small Fixed
+# Payment in every phase so the balance never clears early; "computed" grids do the same in all
+# but the last phase, which amortizes the remainder with the annuity formula.
+PRICE = 1e9
+DOWN_PAYMENT = 1e8
+DISCOUNT_RATE = 5.0
+START_DATE = date(2025, 1, 1)
+
+# (name, frequency, target rows, phases, payment mode)
+CASES = [
+    ("specific_10_fixed", "Specific Date", 10, 10, "fixed"),
+    ("specific_1k_computed", "Specific Date", 1_000, 1_000, "computed"),
+    ("monthly_360_1phase_computed", "Monthly", 360, 1, "computed"),
+    ("monthly_1k_50phase_fixed", "Monthly", 1_200, 50, "fixed"),
+    ("weekly_10k_2phase_computed", "Weekly", 10_400, 2, "computed"),
+    ("daily_11k_1phase_computed", "Daily", 10_950, 1, "computed"),
+    ("daily_100k_30phase_fixed", "Daily", 109_500, 30, "fixed"),
+    ("daily_100k_1phase_computed", "Daily", 109_500, 1, "computed"),
+]
+
+
+def make_grid(frequency, rows, phases, mode):
+    records = []
+    if frequency == "Specific Date":
+        for i in range(rows):
+            last = mode == "computed" and i == rows - 1
+            records.append({
+                "Years": 0.0, "Frequency": "Specific Date", "Target Date": START_DATE + timedelta(days=30 * (i + 1)),
+                "Payment %": 0.0 if last else 100 / (rows + 1), "Fixed Payment": 0.0, "Interest Rate %": 5.0,
+                "Notes": f"Installment {i + 1}",
+            })
+    else:
+        years = rows / phases / FREQ_MAP[frequency]
+        for i in range(phases):
+            last = mode == "computed" and i == phases - 1
+            records.append({
+                "Years": years, "Frequency": frequency, "Target Date": None,
+                "Payment %": 0.0, "Fixed Payment": 0.0 if last else 1_000.0, "Interest Rate %": 5.0,
+                "Notes": f"Phase {i + 1}",
+            })
+    return pd.DataFrame(records)
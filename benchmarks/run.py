@@ -0,0 +1,161 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+from benchmarks.grids import CASES, DISCOUNT_RATE, DOWN_PAYMENT, PRICE, START_DATE, make_grid
+from finance.charts import chart_frames
+from finance.display import display_strings
+from finance.engine import calculate_schedule, calculate_schedule_vectorized
+from finance.export import export_bytes, schedule_csv
+from finance.report import create_pdf
+
+# ==========================================
+# BENCHMARK SUITE
+# ==========================================
+# Times the calculation, export and rendering paths over synthetic grids from a few rows to
+# ~100k, writes the numbers to JSON and flags anything that got slower (or hungrier) than the
+# stored baseline by more than --threshold.
+#   python -m benchmarks.run                         # run and compare against benchmarks/baseline.json
+#   python -m benchmarks.run --update-baseline       # re-record the baseline on this machine
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+STAGES = ["engine", "reference", "csv", "xlsx", "parquet", "display", "charts", "pdf"]
+# Differences below these are timer/allocator noise, whatever the ratio
+NOISE_FLOOR = {"seconds": 0.005, "peak_mb": 1.0}
+
+
+def display_format(df):
+    # Server-side work of the DETAILED DATA tab when the locale needs text columns (en_US needs none)
+    return display_strings(df, symbol="€", locale="de_DE")
+
+
+def stage_functions(grid, schedule):
+    res = {"df": schedule}
+    return {
+        "engine": lambda: calculate_schedule_vectorized(PRICE, DOWN_PAYMENT, DISCOUNT_RATE, grid, START_DATE),
+        "reference": lambda: calculate_schedule(PRICE, DOWN_PAYMENT, DISCOUNT_RATE, grid, START_DATE),
+        "csv": lambda: schedule_csv(res["df"]),
+        "xlsx": lambda: export_bytes(res["df"], "xlsx"),
+        "parquet": lambda: export_bytes(res["df"], "parquet"),
+        "display": lambda: display_format(res["df"]),
+        "charts": lambda: chart_frames(res["df"]),
+        "pdf": lambda: create_pdf("BENCHMARK", "$", 0.0, 0.0, 0.0, PRICE, DOWN_PAYMENT, res["df"], START_DATE),
+    }
+
+
+def measure(fn, repeat):
+    # One untimed warm-up run (imports, caches), best-of-N wall time, then one extra traced run
+    # for peak memory (tracing skews timings)
+    fn()
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    tracemalloc.start()
+    try:
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return best, peak
+
+
+def run(cases=CASES, stages=STAGES, repeat=3, max_rows=None, reference_max_rows=20_000, pdf_max_rows=20_000, log=print):
+    results = []
+    for name, frequency, rows, phases, mode in cases:
+        if max_rows is not None and rows > max_rows:
+            continue
+        grid = make_grid(frequency, rows, phases, mode)
+        schedule = calculate_schedule_vectorized(PRICE, DOWN_PAYMENT, DISCOUNT_RATE, grid, START_DATE)[0]
+        fns = stage_functions(grid, schedule)
+        for stage in stages:
+            if stage == "reference" and reference_max_rows is not None and len(schedule) > reference_max_rows:
+                continue
+            if stage in ("pdf", "xlsx") and pdf_max_rows is not None and len(schedule) > pdf_max_rows:
+                continue
+            seconds, peak = measure(fns[stage], repeat)
+            record = {
+                "case": name, "stage": stage, "rows": len(schedule), "seconds": seconds,
+                "peak_mb": peak / 1e6, "rows_per_sec": len(schedule) / seconds if seconds else None,
+            }
+            results.append(record)
+            log(f"{name:<30} {stage:<10} {record['rows']:>8,} rows {seconds * 1000:>10.1f} ms "
+                f"{record['peak_mb']:>8.1f} MB {record['rows_per_sec'] or 0:>12,.0f} rows/s")
+    return results
+
+
+def compare(results, baseline, threshold):
+    # A regression is a (case, stage) whose time or peak memory exceeds baseline * (1 + threshold)
+    base = {(r["case"], r["stage"]): r for r in baseline.get("results", [])}
+    regressions = []
+    for r in results:
+        b = base.get((r["case"], r["stage"]))
+        if b is None:
+            continue
+        for metric in ("seconds", "peak_mb"):
+            if r[metric] > b[metric] * (1 + threshold) and r[metric] - b[metric] > NOISE_FLOOR[metric]:
+                regressions.append({
+                    "case": r["case"], "stage": r["stage"], "metric": metric,
+                    "baseline": b[metric], "current": r[metric], "ratio": r[metric] / b[metric],
+                })
+    return regressions
+
+
+def environment():
+    import numpy, pandas
+    return {
+        "python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count(),
+        "numpy": numpy.__version__, "pandas": pandas.__version__,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark schedule calculation, export and rendering.")
+    parser.add_argument("-o", "--output", default="benchmark_results.json", help="JSON file for this run's results")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed slowdown before flagging, e.g. 0.25 = +25%%")
+    parser.add_argument("--update-baseline", action="store_true", help="Write this run as the new baseline")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per stage (best is kept)")
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=STAGES)
+    parser.add_argument("--cases", nargs="+", help="Only run these case names")
+    parser.add_argument("--max-rows", type=int, help="Skip cases larger than this")
+    parser.add_argument("--reference-max-rows", type=int, default=20_000, help="Largest schedule for the reference loop (0 = no limit)")
+    parser.add_argument("--pdf-max-rows", type=int, default=20_000, help="Largest schedule to render as PDF or Excel (0 = no limit)")
+    args = parser.parse_args(argv)
+
+    cases = [c for c in CASES if args.cases is None or c[0] in args.cases]
+    results = run(cases, args.stages, args.repeat, args.max_rows, args.reference_max_rows or None, args.pdf_max_rows or None)
+    report = {"environment": environment(), "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"), "results": results}
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {len(results)} measurements to {args.output}")
+
+    if args.update_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline updated: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --update-baseline to record one")
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    # Timings only compare on like hardware and library versions
+    for key, value in report["environment"].items():
+        if baseline.get("environment", {}).get(key) != value:
+            print(f"WARNING baseline {key} is {baseline.get('environment', {}).get(key)!r}, this run has {value!r}")
+    regressions = compare(results, baseline, args.threshold)
+    for r in regressions:
+        print(f"REGRESSION {r['case']} {r['stage']} {r['metric']}: {r['baseline']:.4g} -> {r['current']:.4g} ({r['ratio']:.2f}x)")
+    print(f"{len(regressions)} regression(s) over +{args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
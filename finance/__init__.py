@@ -0,0 +1,3 @@
+# Headless finance core: nothing here imports Streamlit, and numpy, pandas, numpy_financial, fpdf
+# and babel are only loaded on first use (see finance._lazy), so `import finance` costs milliseconds.
+from finance.engine import calculate_schedule, calculate_schedule_vectorized, FREQ_MAP, SCHEDULE_COLUMNS
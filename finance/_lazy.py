@@ -0,0 +1,32 @@
+import importlib
+import threading
+import types
+
+# ==========================================
+# LAZY IMPORTS
+# ==========================================
+# Module-level stand-ins for heavy dependencies (numpy, pandas, fpdf, babel...). The real import
+# happens on first attribute access, so `import finance` stays cheap for CLI jobs and workers.
+
+
+class LazyModule(types.ModuleType):
+    def __init__(self, name):
+        super().__init__(name)
+        self.__dict__["_lazy_lock"] = threading.Lock()
+
+    def _load(self):
+        with self.__dict__["_lazy_lock"]:
+            module = importlib.import_module(self.__name__)
+            # Copy the namespace over so later lookups never reach __getattr__ again
+            self.__dict__.update(module.__dict__)
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+
+def lazy_import(name):
+    return LazyModule(name)
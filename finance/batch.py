@@ -0,0 +1,209 @@
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from finance._lazy import lazy_import
+from finance.engine import schedule_arrays, npv_rows, SCHEDULE_COLUMNS
+from finance.export import EXPORT_FORMATS, export_format, write_export
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+# ==========================================
+# BATCH PORTFOLIO PRICING
+# ==========================================
+# A deal table has one row per unit: price, down_payment, discount_rate, start_date and either
+# a grid_id (looked up in `grids`) or inline `phases` (DataFrame, list of row dicts or JSON).
+# Deals sharing a phase structure and start date are priced together as one (deals x rows) block.
+GRID_COLUMNS = ["Years", "Frequency", "Target Date", "Payment %", "Fixed Payment", "Interest Rate %"]
+TOTAL_COLUMNS = ["total_cost", "total_interest", "npv", "payments"]
+POOL_MIN_STRUCTURES = 8
+BLOCK_DEALS = 2000
+
+
+def grid_records(phases):
+    if isinstance(phases, str):
+        phases = json.loads(phases)
+    if isinstance(phases, pd.DataFrame):
+        phases = phases.to_dict('records')
+    records = []
+    for row in phases:
+        record = {}
+        for col in GRID_COLUMNS:
+            val = row.get(col)
+            record[col] = None if val is None or (not isinstance(val, str) and pd.isna(val)) else val
+        records.append(record)
+    return records
+
+
+def structure_key(records, start_date):
+    return json.dumps([str(start_date), records], default=str, sort_keys=True)
+
+
+def phases_frame(records):
+    return pd.DataFrame(records, columns=GRID_COLUMNS).astype({
+        "Years": float, "Payment %": float, "Fixed Payment": float, "Interest Rate %": float
+    })
+
+
+def price_structure(records, start_date, prices, down_payments, discount_rates, with_schedules=False, conventions=None,
+                    rates=None):
+    # `rates` (one annual % per deal) overrides the Interest Rate % of every phase
+    phases_df = phases_frame(records)
+    arrays = schedule_arrays(prices, down_payments, phases_df, start_date, conventions, rates)
+    mask = arrays["mask"]
+
+    totals = {
+        "total_cost": np.where(mask, arrays["payment"], 0).sum(axis=1) + down_payments,
+        "total_interest": np.where(mask, arrays["interest"], 0).sum(axis=1),
+        "npv": npv_rows(discount_rates, down_payments, arrays["payment"], mask),
+        "payments": mask.sum(axis=1),
+    }
+
+    schedules = None
+    if with_schedules:
+        deal_pos, row_pos = np.nonzero(mask)
+        schedules = pd.DataFrame({
+            "deal": deal_pos,
+            "Phase": arrays["phase"][row_pos],
+            "Payment Date": pd.to_datetime(arrays["date"][row_pos]),
+            "Payment": arrays["payment"][deal_pos, row_pos],
+            "Interest": arrays["interest"][deal_pos, row_pos],
+            "Principal": arrays["principal"][deal_pos, row_pos],
+            "Balance": arrays["balance"][deal_pos, row_pos],
+        })
+    return totals, schedules
+
+
+def _price_group(task):
+    return price_structure(*task)
+
+
+def group_deals(deals, grids=None):
+    grids = {str(k): grid_records(v) for k, v in (grids or {}).items()}
+    groups = {}
+    for pos, deal in enumerate(deals.to_dict('records')):
+        phases = deal.get('phases')
+        if phases is None or (not isinstance(phases, (str, list, pd.DataFrame)) and pd.isna(phases)):
+            records = grids[str(deal['grid_id'])]
+        else:
+            records = grid_records(phases)
+        start_date = pd.to_datetime(deal['start_date'])
+        key = structure_key(records, start_date)
+        groups.setdefault(key, (records, start_date, []))[2].append(pos)
+    return list(groups.values())
+
+
+def run_batch(deals, grids=None, with_schedules=False, workers=None, conventions=None):
+    prices = deals['price'].to_numpy(dtype=float)
+    down_payments = deals['down_payment'].to_numpy(dtype=float)
+    discount_rates = deals['discount_rate'].to_numpy(dtype=float)
+
+    groups = group_deals(deals, grids)
+    tasks = []
+    for records, start_date, pos in groups:
+        pos = np.asarray(pos)
+        tasks.append((records, start_date, prices[pos], down_payments[pos], discount_rates[pos], with_schedules, conventions))
+
+    if workers != 1 and len(tasks) >= POOL_MIN_STRUCTURES:
+        workers = workers or os.cpu_count()
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_price_group, tasks, chunksize=max(1, len(tasks) // (workers * 4))))
+    else:
+        results = [_price_group(task) for task in tasks]
+
+    totals = pd.DataFrame(index=deals.index, columns=TOTAL_COLUMNS, dtype=float)
+    schedules = []
+    for (_, _, pos), (group_totals, group_schedules) in zip(groups, results):
+        for col in TOTAL_COLUMNS:
+            totals.iloc[pos, totals.columns.get_loc(col)] = group_totals[col]
+        if group_schedules is not None:
+            group_schedules["deal"] = deals.index[np.asarray(pos)[group_schedules["deal"].to_numpy()]]
+            schedules.append(group_schedules)
+
+    totals["payments"] = totals["payments"].astype(int)
+    if not with_schedules:
+        return totals, None
+    if schedules:
+        schedule_df = pd.concat(schedules, ignore_index=True)
+        order = np.argsort(deals.index.get_indexer(schedule_df["deal"]), kind='stable')
+        schedule_df = schedule_df.iloc[order].reset_index(drop=True)
+    else:
+        schedule_df = pd.DataFrame(columns=["deal"] + SCHEDULE_COLUMNS)
+    return totals, schedule_df
+
+
+def iter_batch_schedules(deals, grids=None, conventions=None, block_deals=BLOCK_DEALS):
+    # Streams (positions, totals, schedules) for blocks of at most `block_deals` deals sharing a
+    # structure, in the order of the structures' first deals, so portfolio schedules can be written
+    # out chunk by chunk without ever holding all of them.
+    prices = deals['price'].to_numpy(dtype=float)
+    down_payments = deals['down_payment'].to_numpy(dtype=float)
+    discount_rates = deals['discount_rate'].to_numpy(dtype=float)
+    for records, start_date, pos in group_deals(deals, grids):
+        pos = np.asarray(pos)
+        for start in range(0, len(pos), block_deals):
+            block = pos[start:start + block_deals]
+            totals, schedules = price_structure(records, start_date, prices[block], down_payments[block],
+                                                discount_rates[block], True, conventions)
+            schedules["deal"] = deals.index[block[schedules["deal"].to_numpy()]]
+            yield block, totals, schedules
+
+
+# ==========================================
+# CLI
+# ==========================================
+def read_table(path):
+    if path.endswith('.json'):
+        return pd.read_json(path, orient='records')
+    return pd.read_csv(path)
+
+
+def load_grids(path):
+    grid_df = read_table(path)
+    return {str(grid_id): rows.drop(columns='grid_id') for grid_id, rows in grid_df.groupby('grid_id', sort=False)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Price a table of deals against their payment phase grids.")
+    parser.add_argument("deals", help="CSV/JSON with price, down_payment, discount_rate, start_date and grid_id or phases")
+    parser.add_argument("--grids", help="CSV/JSON of phase rows with a grid_id column")
+    parser.add_argument("-o", "--output", default="batch_results.csv", help="Per-deal totals CSV")
+    parser.add_argument("--schedules", help="Also stream every deal's full schedule to this file "
+                                            f"({', '.join('.' + f['extension'] for f in EXPORT_FORMATS.values())}), "
+                                            "grouped by phase structure")
+    parser.add_argument("--workers", type=int, default=None, help="Process pool size (1 disables the pool)")
+    args = parser.parse_args(argv)
+    try:
+        schedules_format = export_format(args.schedules) if args.schedules else None
+    except ValueError as e:
+        parser.error(str(e))
+
+    deals = read_table(args.deals)
+    grids = load_grids(args.grids) if args.grids else None
+
+    if args.schedules:
+        # Totals are filled in as the schedule blocks stream past, in a single process
+        totals = pd.DataFrame(index=deals.index, columns=TOTAL_COLUMNS, dtype=float)
+
+        def schedule_blocks():
+            for pos, block_totals, schedules in iter_batch_schedules(deals, grids):
+                for col in TOTAL_COLUMNS:
+                    totals.iloc[pos, totals.columns.get_loc(col)] = block_totals[col]
+                if 'deal_id' in deals.columns:
+                    schedules['deal'] = deals['deal_id'].reindex(schedules['deal']).to_numpy()
+                yield schedules
+
+        write_export(schedule_blocks(), schedules_format, args.schedules)
+        totals["payments"] = totals["payments"].astype(int)
+    else:
+        totals, _ = run_batch(deals, grids, workers=args.workers)
+
+    id_cols = [c for c in ('deal_id', 'grid_id') if c in deals.columns]
+    deals[id_cols].join(totals).to_csv(args.output, index=False)
+    print(f"Priced {len(deals)} deals -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+import hashlib
+import json
+import sys
+import threading
+from collections import OrderedDict
+
+from finance._lazy import lazy_import
+from finance.engine import calculate_schedule_vectorized
+from finance.timing import span
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+# ==========================================
+# CONTENT-ADDRESSED RESULT CACHE
+# ==========================================
+# Only the columns the engine reads take part in the key, so edits to Notes never miss.
+KEY_COLUMNS = ["Years", "Frequency", "Target Date", "Payment %", "Fixed Payment", "Interest Rate %"]
+NUMERIC_KEY_COLUMNS = ["Years", "Payment %", "Fixed Payment", "Interest Rate %"]
+
+
+def _canonical_value(val):
+    if val is None or (not isinstance(val, str) and pd.isna(val)):
+        return None
+    return val
+
+
+def canonical_grid(phases_df):
+    # st.data_editor hands back ints or floats, None or NaN, date or Timestamp depending on what
+    # was touched; collapse all of those to one spelling. The index stays in because it names phases.
+    grid = phases_df.reindex(columns=KEY_COLUMNS)
+    rows = []
+    for index, row in zip(phases_df.index, grid.to_dict('records')):
+        record = [int(index) if isinstance(index, (int, np.integer)) else str(index)]
+        for col in KEY_COLUMNS:
+            val = _canonical_value(row[col])
+            if val is not None:
+                if col in NUMERIC_KEY_COLUMNS:
+                    val = float(val)
+                elif col == "Target Date":
+                    val = pd.to_datetime(val).strftime('%Y-%m-%d')
+                else:
+                    val = str(val)
+            record.append(val)
+        rows.append(record)
+    return rows
+
+
+def result_key(price, down_payment, discount_rate, phases_df, start_date, conventions=None):
+    payload = {
+        "price": float(price),
+        "down_payment": float(down_payment),
+        "discount_rate": float(discount_rate),
+        "start_date": pd.to_datetime(start_date).strftime('%Y-%m-%d'),
+        "grid": canonical_grid(phases_df),
+    }
+    if conventions:
+        payload["conventions"] = conventions
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+def estimate_bytes(value):
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (tuple, list)):
+        return sum(estimate_bytes(v) for v in value) + sys.getsizeof(value)
+    if isinstance(value, dict):
+        return sum(estimate_bytes(v) for v in value.values()) + sys.getsizeof(value)
+    return sys.getsizeof(value)
+
+
+class ResultCache:
+    def __init__(self, max_bytes=256 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, counted=True):
+        # counted=False keeps lookups that are not analysis runs (exports, overlays, goal-seek
+        # evaluations) out of the hit stats; they still refresh the LRU order
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += counted
+                return None
+            self._entries.move_to_end(key)
+            self.hits += counted
+            return entry[0]
+
+    def peek(self, key):
+        # Like get, but neither counted in the hit stats nor refreshed in the LRU order
+        with self._lock:
+            entry = self._entries.get(key)
+            return None if entry is None else entry[0]
+
+    def put(self, key, value, nbytes=None):
+        nbytes = estimate_bytes(value) if nbytes is None else nbytes
+        with self._lock:
+            if key in self._entries:
+                self.current_bytes -= self._entries.pop(key)[1]
+            if nbytes > self.max_bytes:
+                return value
+            self._entries[key] = (value, nbytes)
+            self.current_bytes += nbytes
+            while self.current_bytes > self.max_bytes:
+                _, (_, evicted_bytes) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_bytes
+                self.evictions += 1
+        return value
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def get_or_compute(self, key, compute, counted=True):
+        value = self.get(key, counted)
+        if value is None:
+            value = self.put(key, compute())
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries), "bytes": self.current_bytes, "max_bytes": self.max_bytes,
+                "hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+def cached_calculate_schedule(cache, price, down_payment, discount_rate, phases_df, start_date,
+                              engine=calculate_schedule_vectorized, conventions=None, counted=True):
+    # conventions is only passed on when set, so engines without calendar support still plug in
+    with span("cache.key"):
+        key = result_key(price, down_payment, discount_rate, phases_df, start_date, conventions)
+    extra = {"conventions": conventions} if conventions else {}
+    result = cache.get_or_compute(
+        key, lambda: engine(price, down_payment, discount_rate, phases_df, start_date, **extra), counted
+    )
+    return key, result
@@ -0,0 +1,123 @@
+from finance._lazy import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+# ==========================================
+# DATED CASH FLOWS: XNPV & XIRR
+# ==========================================
+# Discounting on actual dates, (1 + r) ** -(days / 365) from the first flow, as spreadsheet
+# XNPV/XIRR do. Ragged batches of schedules are padded into (schedules x flows) arrays with zero
+# amounts, which drop out of every sum, so thousands of IRRs are solved together.
+DAYS_PER_YEAR = 365.0
+MIN_RATE = -0.99
+MAX_RATE = 1e4
+
+
+def pad_ragged(rows, fill=0.0, dtype=float):
+    # list of 1-D arrays -> (len(rows) x longest) array plus a mask of the real entries
+    lengths = np.array([len(r) for r in rows], dtype=int)
+    width = int(lengths.max()) if len(rows) else 0
+    mask = np.arange(width) < lengths[:, None]
+    out = np.full((len(rows), width), fill, dtype=dtype)
+    if len(rows):
+        out[mask] = np.concatenate([np.asarray(r, dtype=dtype) for r in rows])
+    return out, mask
+
+
+def year_times(dates, start_date):
+    dates = np.asarray(dates, dtype='datetime64[D]')
+    return (dates - np.datetime64(pd.Timestamp(start_date).date(), 'D')).astype(float) / DAYS_PER_YEAR
+
+
+def accrual_times(dates, start_date):
+    # year_times on the engine's accrual clock: a flow's gap from the one before only counts going
+    # forward, so rows dated before the start date sit at t=0 and the rows after them keep their
+    # real spacing (as the engine accrues from each payment date to the next)
+    gaps = np.diff(year_times(dates, start_date), prepend=0.0)
+    return np.cumsum(np.maximum(gaps, 0))
+
+
+def xnpv(rates, amounts, times):
+    # rates: scalar or one per row; amounts/times: (rows x flows) or a single 1-D schedule
+    amounts, times = np.atleast_2d(amounts), np.atleast_2d(times)
+    log_growth = np.log1p(np.broadcast_to(np.asarray(rates, dtype=float), amounts.shape[:1]))
+    return (amounts * np.exp(-times * log_growth[:, None])).sum(axis=1)
+
+
+def _value_and_slope(amounts, times, rate):
+    log_growth = np.log1p(rate)[:, None]
+    discounted = amounts * np.exp(-times * log_growth)
+    value = discounted.sum(axis=1)
+    slope = -(times * discounted).sum(axis=1) / (1 + rate)
+    return value, slope
+
+
+def xirr(amounts, times, guess=0.1, tol=1e-10, max_iter=100):
+    # Safeguarded Newton over every row at once: each row keeps a sign-change bracket and falls
+    # back to bisection whenever a Newton step leaves it. Rows with no sign change get NaN.
+    amounts, times = np.atleast_2d(np.asarray(amounts, dtype=float)), np.atleast_2d(np.asarray(times, dtype=float))
+    n = amounts.shape[0]
+    result = np.full(n, np.nan)
+    scale = np.abs(amounts).sum(axis=1)
+    scale[scale == 0] = 1.0
+
+    lo = np.full(n, MIN_RATE)
+    hi = np.full(n, 1.0)
+    f_lo = _value_and_slope(amounts, times, lo)[0]
+    f_hi = _value_and_slope(amounts, times, hi)[0]
+    # Widen the upper end until the sign flips (or give up at MAX_RATE)
+    grow = np.sign(f_lo) == np.sign(f_hi)
+    while grow.any() and hi[grow].max() < MAX_RATE:
+        hi[grow] *= 10
+        f_hi[grow] = _value_and_slope(amounts[grow], times[grow], hi[grow])[0]
+        grow &= np.sign(f_lo) == np.sign(f_hi)
+
+    active = np.flatnonzero(~grow)
+    rate = np.clip(np.full(active.size, float(guess)), lo[active] + 1e-12, hi[active] - 1e-12)
+    lo, hi, f_lo, scale = lo[active], hi[active], f_lo[active], scale[active]
+    a, t = amounts[active], times[active]
+
+    for _ in range(max_iter):
+        if not active.size:
+            break
+        value, slope = _value_and_slope(a, t, rate)
+        same = np.sign(value) == np.sign(f_lo)
+        lo, f_lo = np.where(same, rate, lo), np.where(same, value, f_lo)
+        hi = np.where(same, hi, rate)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            step = rate - value / slope
+        bad = ~np.isfinite(step) | (step <= lo) | (step >= hi)
+        new_rate = np.where(bad, (lo + hi) / 2, step)
+
+        done = (np.abs(value) <= tol * scale) | (np.abs(new_rate - rate) <= tol * (1 + np.abs(rate)))
+        result[active[done]] = np.where(np.abs(value[done]) <= tol * scale[done], rate[done], new_rate[done])
+        keep = ~done
+        active, rate, lo, hi, f_lo, scale, a, t = (
+            active[keep], new_rate[keep], lo[keep], hi[keep], f_lo[keep], scale[keep], a[keep], t[keep]
+        )
+    return result
+
+
+# --- SCHEDULE HELPERS ---
+def financing_flows(df_schedule, price, down_payment):
+    # Buyer's view of the plan: the financed amount arrives at the start date, payments go out
+    return np.concatenate(([price - down_payment], -df_schedule['Payment'].to_numpy(dtype=float)))
+
+
+def flow_dates(df_schedule, start_date):
+    start = np.datetime64(pd.Timestamp(start_date).date(), 'D')
+    return np.concatenate(([start], df_schedule['Payment Date'].to_numpy().astype('datetime64[D]')))
+
+
+def schedule_metrics(schedules, prices, down_payments, discount_rates, start_dates):
+    # XNPV (buyer's outflows at the annual discount rate, down payment at t=0) and XIRR (the
+    # effective annual cost of the financing) for many schedules in one padded batch
+    flows = [financing_flows(df, p, d) for df, p, d in zip(schedules, prices, down_payments)]
+    times = [accrual_times(flow_dates(df, s), s) for df, s in zip(schedules, start_dates)]
+    amounts, _ = pad_ragged(flows)
+    t, _ = pad_ragged(times)
+    outflows = np.where(np.arange(amounts.shape[1]) == 0, 0.0, amounts)
+    xnpvs = xnpv(np.asarray(discount_rates, dtype=float) / 100, outflows, t) - np.asarray(down_payments, dtype=float)
+    return xnpvs, xirr(amounts, t)
@@ -0,0 +1,82 @@
+from finance._lazy import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+# ==========================================
+# CHART AGGREGATION & DOWNSAMPLING
+# ==========================================
+# Keeps what is sent to the browser under a fixed point budget however long the schedule is:
+# payment bars are summed into calendar buckets, the balance curve is thinned with LTTB.
+BAR_POINT_BUDGET = 400
+LINE_POINT_BUDGET = 1000
+BUCKETS = {"MONTHLY": "M", "QUARTERLY": "Q", "ANNUAL": "Y"}
+BUCKET_MONTHS = {"M": 1, "Q": 3, "Y": 12}
+
+
+def span_bucket(first, last, budget=BAR_POINT_BUDGET):
+    # Finest calendar bucket that covers [first, last] in at most `budget` buckets
+    span_months = (last.year - first.year) * 12 + (last.month - first.month) + 1
+    for freq in ("M", "Q", "Y"):
+        if span_months / BUCKET_MONTHS[freq] <= budget:
+            return freq
+    return "Y"
+
+
+def choose_bucket(dates, budget=BAR_POINT_BUDGET):
+    # Finest calendar bucket that fits the budget, or None when the raw rows already fit
+    if len(dates) <= budget:
+        return None
+    return span_bucket(dates.iloc[0], dates.iloc[-1], budget)
+
+
+def aggregate_schedule(df, freq):
+    # Sums flows per calendar bucket (labelled by the bucket start) and keeps the closing balance
+    dates = pd.to_datetime(df["Payment Date"])
+    buckets = dates.dt.to_period(freq).dt.to_timestamp()
+    grouped = df.groupby(buckets.to_numpy(), sort=True)
+    out = grouped[["Payment", "Interest", "Principal"]].sum()
+    out["Balance"] = grouped["Balance"].last()
+    out.index.name = "Payment Date"
+    return out
+
+
+def lttb(x, y, threshold):
+    # Largest-Triangle-Three-Buckets: returns the indices of the points to keep
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    keep = np.empty(threshold, dtype=int)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[end:next_end].mean() if next_end > end else x[-1]
+        avg_y = y[end:next_end].mean() if next_end > end else y[-1]
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        keep[i + 1] = a
+    return keep
+
+
+def balance_curve(df, budget=LINE_POINT_BUDGET):
+    dates = pd.to_datetime(df["Payment Date"])
+    keep = lttb(dates.to_numpy().astype("datetime64[ns]").astype(np.int64), df["Balance"].to_numpy(), budget)
+    return pd.DataFrame({"Balance": df["Balance"].to_numpy()[keep]}, index=pd.Index(dates.to_numpy()[keep], name="Payment Date"))
+
+
+def chart_frames(df, bucket="AUTO", bar_budget=BAR_POINT_BUDGET, line_budget=LINE_POINT_BUDGET):
+    # Returns (bars, balance, bucket_label); bucket is AUTO, NONE or a key of BUCKETS
+    dates = pd.to_datetime(df["Payment Date"])
+    freq = choose_bucket(dates, bar_budget) if bucket == "AUTO" else BUCKETS.get(bucket)
+    if freq is None:
+        bars = df.set_index("Payment Date")[["Interest", "Principal"]]
+        label = "NONE"
+    else:
+        bars = aggregate_schedule(df, freq)[["Interest", "Principal"]]
+        label = next(k for k, v in BUCKETS.items() if v == freq)
+    return bars, balance_curve(df, line_budget), label
@@ -0,0 +1,53 @@
+import functools
+
+from finance._lazy import lazy_import
+
+babel = lazy_import("babel")
+babel_numbers = lazy_import("babel.numbers")
+
+# ==========================================
+# CURRENCY METADATA
+# ==========================================
+# Babel lookups are cached per process: the currency selectbox formats every option on every
+# rerun, and the answers never change for a given (code, locale).
+ACTIVE_CURRENCIES = ['USD', 'EUR', 'GBP', 'JPY', 'CNY', 'AED', 'SAR', 'CAD', 'AUD', 'CHF', 'INR', 'RUB', 'TRY', 'ZAR']
+DEFAULT_LOCALE = 'en_US'
+LOCALES = ['en_US', 'en_GB', 'de_DE', 'fr_FR', 'de_CH', 'es_ES', 'ja_JP']
+
+
+@functools.lru_cache(maxsize=None)
+def currency_symbol(code, locale=DEFAULT_LOCALE):
+    return babel_numbers.get_currency_symbol(code, locale=locale)
+
+
+@functools.lru_cache(maxsize=None)
+def currency_label(code, locale=DEFAULT_LOCALE):
+    # "USD ($) - US Dollar", or just the code when the locale data has no entry for it
+    try:
+        symbol = currency_symbol(code, locale)
+        name = babel_numbers.get_currency_name(code, locale=locale)
+        return f"{code} ({symbol}) - {name}"
+    except Exception:
+        return code
+
+
+@functools.lru_cache(maxsize=None)
+def currency_labels(locale=DEFAULT_LOCALE):
+    # Every ACTIVE_CURRENCIES label at once, for a selectbox format_func
+    return {code: currency_label(code, locale) for code in ACTIVE_CURRENCIES}
+
+
+@functools.lru_cache(maxsize=None)
+def locale_label(locale):
+    try:
+        return f"{locale} - {babel.Locale.parse(locale).display_name.upper()}"
+    except Exception:
+        return locale
+
+
+@functools.lru_cache(maxsize=None)
+def number_symbols(locale=DEFAULT_LOCALE):
+    # (group separator, decimal separator, currency symbol goes first)
+    pattern = babel.Locale.parse(locale).currency_formats['standard'].pattern.split(';')[0]
+    return (babel_numbers.get_group_symbol(locale=locale), babel_numbers.get_decimal_symbol(locale=locale),
+            pattern.index('¤') < pattern.index('#'))
@@ -0,0 +1,115 @@
+import functools
+
+from finance._lazy import lazy_import
+from finance.currency import DEFAULT_LOCALE, number_symbols
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+babel_dates = lazy_import("babel.dates")
+
+# ==========================================
+# TABLE & NUMBER PRESENTATION
+# ==========================================
+# Tables keep their numbers numeric and hand the grid a format string (column_formats) whenever
+# the locale's separators fit printf's "%,": the browser formats what it shows, the server
+# formats nothing. Other locales get whole columns formatted at once with numpy string ops,
+# never value by value.
+DATE_FORMAT = '%b %d, %Y'
+COLUMN_DATE_FORMAT = 'MMM DD, YYYY'  # momentJS spelling of DATE_FORMAT for the grid
+AMOUNT_COLUMNS = ["Payment", "Interest", "Principal", "Balance"]
+
+
+def column_formats(symbol="", locale=DEFAULT_LOCALE, decimals=0):
+    # printf amount format for grid column configs, or None when the locale's separators differ
+    group, decimal, symbol_first = number_symbols(locale)
+    if (group, decimal) != (",", "."):
+        return None
+    number = f"%,.{decimals}f"
+    if not symbol:
+        return number
+    return f"{symbol}{number}" if symbol_first else f"{number} {symbol}"
+
+
+@functools.lru_cache(maxsize=None)
+def _digit_table(width):
+    # "0".."999" unpadded and zero-padded to `width`, so integers become text by one fancy index
+    plain = np.array([str(i) for i in range(10**width)])
+    return plain, np.char.zfill(plain, width)
+
+
+def _group_digits(whole, group):
+    # 1234567 -> "1,234,567" for an int64 array. Values are split by how many groups of three
+    # digits they have, so each class is joined with a fixed number of array-wide concatenations.
+    plain, padded = _digit_table(3)
+    n_groups = np.ones(whole.shape, dtype=int)
+    for k in range(1, 7):
+        n_groups += whole >= 1000**k
+    text = plain[whole % 1000]
+    for n in np.unique(n_groups[n_groups > 1]):
+        rows = np.flatnonzero(n_groups == n)
+        values = whole[rows]
+        part = plain[values // 1000**(n - 1) % 1000]
+        for k in range(n - 2, -1, -1):
+            part = np.char.add(np.char.add(part, group), padded[values // 1000**k % 1000])
+        text = text.astype(part.dtype) if part.dtype.itemsize > text.dtype.itemsize else text
+        text[rows] = part
+    return text
+
+
+def format_amounts(values, symbol="", locale=DEFAULT_LOCALE, decimals=0):
+    # Vectorized f"{symbol}{x:,.{decimals}f}" with the locale's separators and symbol position;
+    # NaN gives "". Returns a numpy str array.
+    values = np.asarray(values, dtype=float)
+    group, decimal, symbol_first = number_symbols(locale)
+    missing = np.isnan(values)
+    scaled = np.round(np.abs(np.where(missing, 0.0, values)) * 10**decimals).astype(np.int64)
+    whole, frac = np.divmod(scaled, 10**decimals)
+    text = _group_digits(whole, group)
+    if decimals:
+        text = np.char.add(np.char.add(text, decimal), _digit_table(decimals)[1][frac])
+    text = np.where((values < 0) & (scaled > 0), np.char.add("-", text), text)
+    if symbol:
+        text = np.char.add(symbol, text) if symbol_first else np.char.add(text, " " + symbol)
+    return np.where(missing, "", text)
+
+
+def format_amount(value, symbol="", locale=DEFAULT_LOCALE, decimals=0):
+    return format_amounts([value], symbol, locale, decimals)[0]
+
+
+@functools.lru_cache(maxsize=None)
+def _month_names(locale):
+    names = babel_dates.get_month_names('abbreviated', locale=locale)
+    return np.array([names[m] for m in range(1, 13)])
+
+
+def format_dates(values, locale=DEFAULT_LOCALE):
+    # Vectorized DATE_FORMAT ("Mar 05, 2025") with the locale's month abbreviations; NaT gives ""
+    days = pd.to_datetime(pd.Series(values)).to_numpy(dtype='datetime64[D]')
+    missing = np.isnat(days)
+    days = np.where(missing, np.datetime64(0, 'D'), days)
+    months = days.astype('datetime64[M]')
+    day = (days - months.astype('datetime64[D]')).astype(int)
+    years, year_pos = np.unique(days.astype('datetime64[Y]').astype(int) + 1970, return_inverse=True)
+    text = np.char.add(np.char.add(_month_names(locale)[months.astype(int) % 12], " "), _digit_table(2)[1][day + 1])
+    text = np.char.add(np.char.add(text, ", "), years.astype(str)[year_pos])
+    return np.where(missing, "", text)
+
+
+def format_percents(values, locale=DEFAULT_LOCALE, decimals=2):
+    # 0.1414 -> "14.14%"; NaN gives ""
+    values = np.asarray(values, dtype=float)
+    return np.where(np.isnan(values), "", np.char.add(format_amounts(values * 100, "", locale, decimals), "%"))
+
+
+def display_strings(df, amount_columns=AMOUNT_COLUMNS, symbol="", locale=DEFAULT_LOCALE, date_columns=("Payment Date",),
+                    percent_columns=()):
+    # Display copy with the given columns as text, for locales column_formats can't express
+    out = df.copy()
+    for col in date_columns:
+        out[col] = format_dates(out[col], locale)
+    for col in amount_columns:
+        out[col] = format_amounts(out[col], symbol, locale)
+    for col in percent_columns:
+        out[col] = format_percents(out[col], locale)
+    return out
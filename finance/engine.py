@@ -0,0 +1,368 @@
+from datetime import timedelta
+
+from finance._lazy import lazy_import
+from finance.dates import day_of_month, payment_dates, roll_dates, year_fractions
+from finance.timing import span
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+npf = lazy_import("numpy_financial")
+
+# ==========================================
+# CALCULATION ENGINE
+# ==========================================
+FREQ_MAP = {'Daily': 365, 'Weekly': 52, 'Bi-Weekly': 26, 'Monthly': 12,
+            'Bi-Monthly': 6, 'Quarterly': 4, 'Semi-Annually': 2, 'Annually': 1,
+            'Specific Date': 0}
+
+SCHEDULE_COLUMNS = ["Phase", "Payment Date", "Payment", "Interest", "Principal", "Balance"]
+
+
+# --- REFERENCE IMPLEMENTATION (PER-PERIOD LOOP) ---
+def calculate_schedule(price, down_payment, discount_rate, phases_df, start_date):
+    freq_map = FREQ_MAP
+
+    current_balance = price - down_payment
+    schedule = []
+    cash_flows_npv = [-down_payment]
+
+    current_date = pd.to_datetime(start_date)
+
+    for index, row in phases_df.iterrows():
+        if current_balance <= 0.1: break
+
+        freq_type = row['Frequency']
+        rate_annual = row['Interest Rate %'] / 100
+
+        payment_pct = row.get('Payment %', 0.0)
+        fixed_payment = row.get('Fixed Payment', 0.0)
+
+        calculated_payment = 0.0
+        is_fixed_input = False
+
+        if payment_pct > 0:
+            calculated_payment = price * (payment_pct / 100)
+            is_fixed_input = True
+        elif fixed_payment > 0:
+            calculated_payment = fixed_payment
+            is_fixed_input = True
+
+        # --- PATH A: SPECIFIC DATE ---
+        if freq_type == 'Specific Date':
+            target_date = pd.to_datetime(row['Target Date'])
+            if pd.isna(target_date): continue
+
+            days_diff = (target_date - current_date).days
+            if days_diff < 0: days_diff = 0
+            years_diff = days_diff / 365.25
+
+            interest_amount = current_balance * rate_annual * years_diff
+
+            if is_fixed_input:
+                payment = calculated_payment
+            else:
+                payment = current_balance + interest_amount
+
+            principal = payment - interest_amount
+            current_balance -= principal
+
+            schedule.append({
+                "Phase": f"Phase {index + 1}", "Payment Date": target_date,
+                "Payment": payment, "Interest": interest_amount, "Principal": principal, "Balance": max(0, current_balance)
+            })
+            cash_flows_npv.append(-payment)
+            current_date = target_date
+
+        # --- PATH B: STANDARD FREQUENCY ---
+        else:
+            if pd.isna(row['Years']) or row['Years'] <= 0: continue
+
+            n_per_year = freq_map[freq_type]
+            rate_per_period = rate_annual / n_per_year
+            total_periods = int(row['Years'] * n_per_year)
+
+            if is_fixed_input:
+                payment = calculated_payment
+            else:
+                if rate_annual == 0:
+                    payment = current_balance / total_periods
+                else:
+                    payment = (current_balance * rate_per_period) / (1 - (1 + rate_per_period)**(-total_periods))
+
+            for p in range(1, total_periods + 1):
+                interest = current_balance * rate_per_period
+                principal = payment - interest
+                current_balance -= principal
+
+                days_to_add = int(365.25 / n_per_year)
+                current_date = current_date + timedelta(days=days_to_add)
+
+                schedule.append({
+                    "Phase": f"Phase {index + 1}", "Payment Date": current_date,
+                    "Payment": payment, "Interest": interest, "Principal": principal, "Balance": max(0, current_balance)
+                })
+                cash_flows_npv.append(-payment)
+
+    df_schedule = pd.DataFrame(schedule)
+    npv = 0 if len(cash_flows_npv) == 0 else npf.npv(discount_rate/100/12, cash_flows_npv)
+    t_paid = df_schedule['Payment'].sum() + down_payment if not df_schedule.empty else down_payment
+    t_int = df_schedule['Interest'].sum() if not df_schedule.empty else 0
+    return df_schedule, t_paid, t_int, npv
+
+
+# --- ARRAY-BACKED IMPLEMENTATION ---
+def phase_payment(row, price):
+    # Returns (payment, is_fixed_input) using the grid precedence: Payment % > Fixed Payment > computed
+    payment_pct = row.get('Payment %', 0.0)
+    fixed_payment = row.get('Fixed Payment', 0.0)
+    if payment_pct > 0:
+        return price * (payment_pct / 100), True
+    if fixed_payment > 0:
+        return fixed_payment, True
+    return 0.0, False
+
+
+def annuity_payment(balance, rate_per_period, total_periods):
+    # `rate_per_period` is a scalar or one rate per deal
+    if np.ndim(rate_per_period):
+        rate = np.asarray(rate_per_period, dtype=float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(rate == 0, balance / total_periods, (balance * rate) / (1 - (1 + rate)**(-total_periods)))
+    if rate_per_period == 0:
+        return balance / total_periods
+    return (balance * rate_per_period) / (1 - (1 + rate_per_period)**(-total_periods))
+
+
+def amortize(balance, rate_per_period, total_periods, payment):
+    # Closed form of the per-period loop: B_k = B_0 * g_k - P * (g_k - 1) / r with g_k = (1 + r)^k.
+    # `balance`, `payment` and `rate_per_period` broadcast, so a column vector of deals (each with
+    # its own rate, if given one) gives a (deals x periods) block.
+    balance = np.asarray(balance, dtype=float)[..., None]
+    payment = np.asarray(payment, dtype=float)[..., None]
+    k = np.arange(total_periods + 1, dtype=float)
+
+    if np.ndim(rate_per_period):
+        rate_per_period = np.asarray(rate_per_period, dtype=float)[..., None]
+        growth_m1 = np.expm1(k * np.log1p(rate_per_period))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            opening = balance * (1 + growth_m1) - payment * np.where(rate_per_period == 0, k, growth_m1 / rate_per_period)
+    elif rate_per_period == 0:
+        opening = balance - payment * k
+    else:
+        growth_m1 = np.expm1(k * np.log1p(rate_per_period))
+        opening = balance * (1 + growth_m1) - payment * (growth_m1 / rate_per_period)
+
+    closing = opening[..., 1:]
+    interest = opening[..., :-1] * rate_per_period
+    principal = np.broadcast_to(payment, interest.shape) - interest
+    return interest, principal, closing
+
+
+def amortize_accrual(balance, period_rates, payment=None):
+    # Same recursion with a rate per period (day-count accrual): B_k = G_k * (B_0 - P * sum_{j<=k} 1/G_j),
+    # G_k the cumulative growth. With payment=None the level payment that clears the balance is used.
+    # `period_rates` is one row of rates shared by every deal or a (deals x periods) block.
+    balance = np.asarray(balance, dtype=float)[..., None]
+    growth = np.cumprod(1 + period_rates, axis=-1)
+    discount = np.cumsum(1 / growth, axis=-1)
+    payment = balance / discount[..., -1:] if payment is None else np.asarray(payment, dtype=float)[..., None]
+    closing = growth * (balance - payment * discount)
+    opening = np.concatenate((balance, closing[..., :-1]), axis=-1)
+    interest = opening * period_rates
+    principal = np.broadcast_to(payment, interest.shape) - interest
+    return np.broadcast_to(payment, interest.shape), interest, principal, closing
+
+
+def phase_block(index, row, prices, current_balance, current_date, conventions=None, anchor=None, rates=None):
+    # Prices one grid row for every deal from its opening balance and date. Returns None when the
+    # engine skips the row, else the (deals x periods) block plus the closing balance and date.
+    # `rates` (one annual % per deal) replaces the row's Interest Rate %; rates move no dates.
+    if conventions is not None:
+        return _calendar_block(index, row, prices, current_balance, current_date, conventions, anchor, rates)
+    freq_type = row['Frequency']
+    rate_annual = (row['Interest Rate %'] if rates is None else rates) / 100
+    calculated_payment, is_fixed_input = phase_payment(row, prices)
+
+    # --- PATH A: SPECIFIC DATE ---
+    if freq_type == 'Specific Date':
+        target_date = pd.to_datetime(row['Target Date'])
+        if pd.isna(target_date): return None
+        target_date = target_date.to_datetime64()
+
+        days_diff = max(int((target_date - current_date) // np.timedelta64(1, 'D')), 0)
+        interest = current_balance * rate_annual * (days_diff / 365.25)
+        payment = calculated_payment if is_fixed_input else current_balance + interest
+        principal = payment - interest
+        current_balance = current_balance - principal
+
+        block_dates = np.array([target_date], dtype='datetime64[ns]')
+        block = [np.broadcast_to(v, prices.shape)[:, None] for v in (payment, interest, principal, current_balance)]
+        current_date = target_date
+
+    # --- PATH B: STANDARD FREQUENCY ---
+    else:
+        if pd.isna(row['Years']) or row['Years'] <= 0: return None
+
+        n_per_year = FREQ_MAP[freq_type]
+        rate_per_period = rate_annual / n_per_year
+        total_periods = int(row['Years'] * n_per_year)
+        if total_periods == 0: return None
+
+        payment = calculated_payment if is_fixed_input else annuity_payment(current_balance, rate_per_period, total_periods)
+        payment = np.broadcast_to(np.asarray(payment, dtype=float), prices.shape)
+        interest, principal, closing = amortize(current_balance, rate_per_period, total_periods, payment)
+
+        step = np.timedelta64(int(365.25 / n_per_year), 'D')
+        block_dates = current_date + step * np.arange(1, total_periods + 1)
+        block = [np.broadcast_to(payment[:, None], interest.shape), interest, principal, closing]
+        current_balance = closing[:, -1].copy()
+        current_date = block_dates[-1]
+
+    return {
+        "phase": np.full(len(block_dates), f"Phase {index + 1}", dtype=object),
+        "date": block_dates.astype('datetime64[ns]'),
+        "payment": block[0], "interest": block[1], "principal": block[2], "balance": block[3],
+        "end_balance": current_balance, "end_date": current_date, "end_anchor": None,
+    }
+
+
+def _calendar_block(index, row, prices, current_balance, current_date, conventions, anchor, rates=None):
+    # phase_block under finance.dates conventions. `anchor` is the unadjusted (date, contractual
+    # day) the next phase steps from; `current_date` stays the last actual payment date.
+    freq_type = row['Frequency']
+    rate_annual = (row['Interest Rate %'] if rates is None else rates) / 100
+    calculated_payment, is_fixed_input = phase_payment(row, prices)
+    current_date = np.datetime64(current_date, 'D')
+    anchor_date, anchor_day = anchor or (current_date, day_of_month(current_date))
+    flat = conventions["day_count"] == "flat"
+
+    if freq_type == 'Specific Date':
+        target_date = pd.to_datetime(row['Target Date'])
+        if pd.isna(target_date): return None
+        unadjusted = np.array([target_date.to_datetime64()], dtype='datetime64[D]')
+        block_dates = roll_dates(unadjusted, conventions["roll"], conventions["calendar"])
+
+        if flat:
+            days_diff = max(int((block_dates[0] - current_date) // np.timedelta64(1, 'D')), 0)
+            fraction = days_diff / 365.25
+        else:
+            fraction = year_fractions(current_date, block_dates, conventions["day_count"])[0]
+        interest = current_balance * rate_annual * fraction
+        payment = calculated_payment if is_fixed_input else current_balance + interest
+        principal = payment - interest
+        current_balance = current_balance - principal
+        block = [np.broadcast_to(v, prices.shape)[:, None] for v in (payment, interest, principal, current_balance)]
+        end_anchor = (unadjusted[-1], day_of_month(unadjusted[-1]))
+
+    else:
+        if pd.isna(row['Years']) or row['Years'] <= 0: return None
+        n_per_year = FREQ_MAP[freq_type]
+        total_periods = int(row['Years'] * n_per_year)
+        if total_periods == 0: return None
+
+        unadjusted, block_dates = payment_dates(anchor_date, anchor_day, n_per_year, total_periods, conventions)
+        if flat:
+            rate_per_period = rate_annual / n_per_year
+            payment = calculated_payment if is_fixed_input else annuity_payment(current_balance, rate_per_period, total_periods)
+            payment = np.broadcast_to(np.asarray(payment, dtype=float), prices.shape)
+            interest, principal, closing = amortize(current_balance, rate_per_period, total_periods, payment)
+            payment = np.broadcast_to(payment[:, None], interest.shape)
+        else:
+            period_rates = np.multiply.outer(rate_annual, year_fractions(current_date, block_dates, conventions["day_count"]))
+            fixed = np.broadcast_to(np.asarray(calculated_payment, dtype=float), prices.shape) if is_fixed_input else None
+            payment, interest, principal, closing = amortize_accrual(current_balance, period_rates, fixed)
+        block = [payment, interest, principal, closing]
+        current_balance = closing[:, -1].copy()
+        month_based = conventions["anchor"] != "legacy" and 12 % n_per_year == 0
+        end_anchor = (unadjusted[-1], anchor_day if month_based else day_of_month(unadjusted[-1]))
+
+    return {
+        "phase": np.full(len(block_dates), f"Phase {index + 1}", dtype=object),
+        "date": block_dates.astype('datetime64[ns]'),
+        "payment": block[0], "interest": block[1], "principal": block[2], "balance": block[3],
+        "end_balance": current_balance, "end_date": block_dates[-1].astype('datetime64[ns]'), "end_anchor": end_anchor,
+    }
+
+
+def schedule_arrays(prices, down_payments, phases_df, start_date, conventions=None, rates=None):
+    # Prices every deal in `prices` against one phase grid and start date at once.
+    # Rows are shared by all deals (labels, dates); values are (deals x rows) and `mask`
+    # marks the rows each deal actually reaches before its balance is cleared.
+    # `rates`, one annual % per deal, replaces the Interest Rate % of every row.
+    prices = np.atleast_1d(np.asarray(prices, dtype=float))
+    if rates is not None:
+        rates = np.broadcast_to(np.asarray(rates, dtype=float), prices.shape)
+    current_balance = prices - np.atleast_1d(np.asarray(down_payments, dtype=float))
+    active = np.ones(len(prices), dtype=bool)
+    current_date = pd.to_datetime(start_date).to_datetime64()
+    anchor = None
+
+    labels, dates, payments, interests, principals, balances, masks = [], [], [], [], [], [], []
+
+    for index, row in zip(phases_df.index, phases_df.to_dict('records')):
+        active = active & ~(current_balance <= 0.1)
+        if not active.any(): break
+
+        block = phase_block(index, row, prices, current_balance, current_date, conventions, anchor, rates)
+        if block is None: continue
+        current_balance, current_date, anchor = block["end_balance"], block["end_date"], block["end_anchor"]
+
+        labels.append(block["phase"])
+        dates.append(block["date"])
+        payments.append(block["payment"])
+        interests.append(block["interest"])
+        principals.append(block["principal"])
+        balances.append(block["balance"])
+        masks.append(np.broadcast_to(active[:, None], block["interest"].shape))
+
+    if not labels:
+        empty = np.zeros((len(prices), 0))
+        return {"phase": np.zeros(0, dtype=object), "date": np.zeros(0, dtype='datetime64[ns]'),
+                "payment": empty, "interest": empty, "principal": empty, "balance": empty,
+                "mask": empty.astype(bool)}
+
+    return {
+        "phase": np.concatenate(labels),
+        "date": np.concatenate(dates),
+        "payment": np.concatenate(payments, axis=1),
+        "interest": np.concatenate(interests, axis=1),
+        "principal": np.concatenate(principals, axis=1),
+        "balance": np.maximum(np.concatenate(balances, axis=1), 0),
+        "mask": np.concatenate(masks, axis=1),
+    }
+
+
+def npv_rows(discount_rates, down_payments, payments, mask):
+    # Row-wise npf.npv at discount_rate/100/12 per period. Masked rows are always a trailing
+    # run of each deal, so zeroing them leaves every earlier discount exponent unchanged.
+    rates = np.atleast_1d(np.asarray(discount_rates, dtype=float)) / 100 / 12
+    periods = np.arange(1, payments.shape[1] + 1, dtype=float)
+    discount = np.exp(-np.log1p(rates)[:, None] * periods)
+    return -np.atleast_1d(np.asarray(down_payments, dtype=float)) - (np.where(mask, payments, 0) * discount).sum(axis=1)
+
+
+def schedule_frame(arrays, deal=0):
+    keep = arrays["mask"][deal]
+    return pd.DataFrame({
+        "Phase": arrays["phase"][keep],
+        "Payment Date": pd.to_datetime(arrays["date"][keep]),
+        "Payment": arrays["payment"][deal][keep],
+        "Interest": arrays["interest"][deal][keep],
+        "Principal": arrays["principal"][deal][keep],
+        "Balance": arrays["balance"][deal][keep],
+    }, columns=SCHEDULE_COLUMNS)
+
+
+def calculate_schedule_vectorized(price, down_payment, discount_rate, phases_df, start_date, conventions=None):
+    with span("engine.arrays"):
+        arrays = schedule_arrays([price], [down_payment], phases_df, start_date, conventions)
+    with span("engine.frame"):
+        df_schedule = schedule_frame(arrays)
+
+    payment_col = df_schedule['Payment'].to_numpy()
+    with span("engine.npv"):
+        cash_flows_npv = np.concatenate(([-down_payment], -payment_col))
+        npv = npf.npv(discount_rate/100/12, cash_flows_npv)
+    t_paid = payment_col.sum() + down_payment
+    t_int = df_schedule['Interest'].to_numpy().sum()
+    return df_schedule, t_paid, t_int, npv
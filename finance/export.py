@@ -0,0 +1,190 @@
+import hashlib
+import io
+
+from finance._lazy import lazy_import
+from finance.timing import timed
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+pa = lazy_import("pyarrow")
+pq = lazy_import("pyarrow.parquet")
+openpyxl = lazy_import("openpyxl")
+
+# ==========================================
+# SCHEDULE EXPORTERS
+# ==========================================
+# CSV lives here next to the PDF report (finance.report) so CLI jobs and the dashboard produce
+# byte-identical files. Every writer takes a DataFrame or an iterable of DataFrame chunks and
+# streams them into a binary sink chunk by chunk, so a portfolio export never holds more than
+# one chunk of text, cells or Arrow batches on top of what the caller already has.
+EXPORT_FORMATS = {
+    "csv": {"label": "CSV", "extension": "csv", "mime": "text/csv"},
+    "xlsx": {"label": "EXCEL", "extension": "xlsx",
+             "mime": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"},
+    "parquet": {"label": "PARQUET", "extension": "parquet", "mime": "application/vnd.apache.parquet"},
+}
+CHUNK_ROWS = 50_000
+XLSX_MAX_ROWS = 1_048_575  # per sheet, under the header row
+XLSX_FORMATS = {"float": "#,##0.00", "int": "0", "date": "yyyy-mm-dd"}
+
+
+def iter_chunks(frames, chunk_rows=CHUNK_ROWS):
+    # Re-slices a DataFrame or a stream of them into chunks of at most chunk_rows. An input with
+    # no rows still yields its first (empty) frame so writers can emit the header.
+    if isinstance(frames, pd.DataFrame):
+        frames = [frames]
+    rows, first = 0, None
+    for frame in frames:
+        first = frame if first is None else first
+        for start in range(0, len(frame), chunk_rows):
+            rows += 1
+            yield frame.iloc[start:start + chunk_rows]
+    if not rows and first is not None:
+        yield first
+
+
+def export_format(path):
+    # Format from a file name's extension, e.g. "schedules.parquet" -> "parquet"
+    ext = path.rsplit(".", 1)[-1].lower()
+    for fmt, spec in EXPORT_FORMATS.items():
+        if spec["extension"] == ext:
+            return fmt
+    raise ValueError(f"unknown export format '.{ext}' (use {', '.join(EXPORT_FORMATS)})")
+
+
+# --- WRITERS ---
+def write_csv(frames, sink, chunk_rows=CHUNK_ROWS, **_):
+    header = True
+    for chunk in iter_chunks(frames, chunk_rows):
+        sink.write(chunk.to_csv(index=False, header=header).encode('utf-8'))
+        header = False
+
+
+def _column_format(series, number_formats):
+    if series.name in number_formats:
+        return number_formats[series.name]
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return XLSX_FORMATS["date"]
+    if pd.api.types.is_float_dtype(series):
+        return XLSX_FORMATS["float"]
+    if pd.api.types.is_integer_dtype(series):
+        return XLSX_FORMATS["int"]
+    return None
+
+
+def _cell_values(series):
+    # Plain Python values openpyxl can write; NaN/NaT become empty cells
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return [None if v is pd.NaT else v for v in series.dt.to_pydatetime()]
+    if pd.api.types.is_float_dtype(series):
+        return [None if v != v else v for v in series.tolist()]
+    return [None if v is None or (not isinstance(v, str) and pd.isna(v)) else v for v in series.tolist()]
+
+
+def _xlsx_sheet(workbook, title, columns, formats):
+    # New write-only sheet with a bold, frozen header; returns it with one styled cell per
+    # formatted column (None for the rest)
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font
+
+    sheet = workbook.create_sheet(title)
+    sheet.freeze_panes = "A2"
+    header = []
+    for name in columns:
+        cell = WriteOnlyCell(sheet, value=str(name))
+        cell.font = Font(bold=True)
+        header.append(cell)
+    sheet.append(header)
+    cells = []
+    for fmt in formats:
+        cell = None
+        if fmt is not None:
+            cell = WriteOnlyCell(sheet)
+            cell.number_format = fmt
+        cells.append(cell)
+    return sheet, cells
+
+
+def write_xlsx(frames, sink, sheet_name="Schedule", number_formats=None, chunk_rows=CHUNK_ROWS, **_):
+    # openpyxl write-only mode streams rows to a temp file instead of building the sheet in memory.
+    # Each row is serialized on append, so one styled cell per column is reused for every row.
+    # Past Excel's row limit the rows continue on "<sheet_name> (2)", "(3)"...
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet, cells, sheet_rows, sheets = None, None, 0, 0
+    for chunk in iter_chunks(frames, chunk_rows):
+        if sheet is None:
+            formats = [_column_format(chunk[c], number_formats or {}) for c in chunk.columns]
+        columns = [_cell_values(chunk[c]) for c in chunk.columns]
+        start = 0
+        while start < len(chunk) or sheet is None:
+            if sheet is None or sheet_rows == XLSX_MAX_ROWS:
+                sheets += 1
+                title = sheet_name if sheets == 1 else f"{sheet_name} ({sheets})"
+                sheet, cells = _xlsx_sheet(workbook, title, chunk.columns, formats)
+                sheet_rows = 0
+            stop = min(len(chunk), start + XLSX_MAX_ROWS - sheet_rows)
+            for values in zip(*(col[start:stop] for col in columns)):
+                row = []
+                for cell, value in zip(cells, values):
+                    if cell is None or value is None:
+                        row.append(value)
+                    else:
+                        cell.value = value
+                        row.append(cell)
+                sheet.append(row)
+            sheet_rows += stop - start
+            start = stop
+    if sheet is None:
+        workbook.create_sheet(sheet_name)
+    workbook.save(sink)
+
+
+def write_parquet(frames, sink, chunk_rows=CHUNK_ROWS, **_):
+    # One row group per chunk; the schema comes from the first chunk
+    writer = None
+    try:
+        for chunk in iter_chunks(frames, chunk_rows):
+            if writer is None:
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                writer = pq.ParquetWriter(sink, table.schema, compression="zstd")
+            else:
+                table = pa.Table.from_pandas(chunk, schema=writer.schema, preserve_index=False)
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+WRITERS = {"csv": write_csv, "xlsx": write_xlsx, "parquet": write_parquet}
+
+
+@timed("export.write")
+def write_export(frames, fmt, target, **options):
+    # `target` is a path or a binary file object; options go to the writer (sheet_name, number_formats, chunk_rows)
+    if isinstance(target, str):
+        with open(target, "wb") as sink:
+            return WRITERS[fmt](frames, sink, **options)
+    return WRITERS[fmt](frames, target, **options)
+
+
+def export_bytes(frames, fmt, **options):
+    buf = io.BytesIO()
+    write_export(frames, fmt, buf, **options)
+    return buf.getvalue()
+
+
+def schedule_csv(df_schedule):
+    return export_bytes(df_schedule, "csv")
+
+
+# --- CACHE KEYS ---
+def export_key(result_key, fmt):
+    # Exports of a cached result share its hash, so every session reuses the same bytes
+    return f"export:{fmt}:{result_key}"
+
+
+def frame_key(df):
+    # Content hash for tables that have no result key of their own (e.g. the comparison page)
+    hashed = pd.util.hash_pandas_object(df, index=True).to_numpy()
+    columns = "|".join(map(str, df.columns)).encode()
+    return hashlib.sha256(hashed.tobytes() + columns).hexdigest()
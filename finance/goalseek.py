@@ -0,0 +1,233 @@
+import time
+
+from finance._lazy import lazy_import
+from finance.cache import cached_calculate_schedule
+from finance.engine import FREQ_MAP
+from finance.incremental import IncrementalSchedule
+from finance.timing import timed
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+# ==========================================
+# GOAL SEEK
+# ==========================================
+# Solves one input (a phase's Payment % / Fixed Payment / Years, or the down payment) so a schedule
+# metric hits a target. Most metrics move one way as the input grows, so the two bounds bracket
+# every reachable target and an Illinois false-position search closes in on it in a few engine
+# runs. The recurring payment against a phase's own payment is V-shaped instead: raising it first
+# lowers what later phases must pay, then becomes the largest payment itself. Only a target below
+# both bounds needs the bottom: it is where the row's payment crosses the largest later one, a root
+# found in the same few runs, and each side is then bracketed on its own. Runs go through the
+# result cache and a private IncrementalSchedule: changing row k reprices only rows k onward, and
+# evaluations repeated across solves are free.
+GOAL_VARIABLES = {
+    "Payment %": {"row": True, "help": "Payment of the chosen phase as % of price. Overrides Fixed Payment."},
+    "Fixed Payment": {"row": True, "help": "Payment of the chosen phase. Clears the phase's Payment %."},
+    "Years": {"row": True, "help": "Duration of the chosen phase, searched in whole payment periods."},
+    "Down Payment": {"row": False, "help": "Down payment paid at the start."},
+}
+GOAL_METRICS = {
+    "Recurring Payment": "Largest payment of the standard-frequency phases (0 once nothing is left to amortize).",
+    "Total Cost": "Down payment plus every scheduled payment.",
+    "Interest Paid": "Interest over the whole schedule.",
+    "NPV": "Absolute NPV of all payments at the discount rate.",
+}
+MAX_YEARS = 50
+MAX_EVALUATIONS = 40
+# (metric, variable) pairs that fall and then rise as the variable grows
+V_SHAPED = {("Recurring Payment", "Payment %"), ("Recurring Payment", "Fixed Payment")}
+
+
+def schedule_metric(metric, df_schedule, t_paid, t_int, npv, phases_df):
+    if metric == "Total Cost":
+        return float(t_paid)
+    if metric == "Interest Paid":
+        return float(t_int)
+    if metric == "NPV":
+        return abs(float(npv))
+    dated = {f"Phase {i + 1}" for i in phases_df.index[phases_df["Frequency"] == "Specific Date"]}
+    recurring = df_schedule.loc[~df_schedule["Phase"].isin(dated), "Payment"]
+    return float(recurring.max()) if len(recurring) else 0.0
+
+
+def variable_bounds(variable, price, down_payment, row=None):
+    # Search interval in the units of the input; Years is in whole periods of the row's frequency
+    if variable == "Payment %":
+        return 0.01, 100.0
+    if variable == "Fixed Payment":
+        return 1.0, max(float(price - down_payment), 1.0)
+    if variable == "Years":
+        return 1, MAX_YEARS * FREQ_MAP[row["Frequency"]]
+    return 0.0, float(price)
+
+
+def apply_variable(variable, value, phases_df, down_payment, row_index=None):
+    # Returns (grid, down_payment) with `value` written in; the grid is a copy
+    grid = phases_df.copy()
+    if variable == "Down Payment":
+        return grid, float(value)
+    if variable == "Years":
+        n_per_year = FREQ_MAP[grid.loc[row_index, "Frequency"]]
+        years = value / n_per_year
+        # The engine takes int(Years * n) periods; nudge up where the division rounded below
+        while int(years * n_per_year) < value:
+            years = np.nextafter(years, np.inf)
+        grid["Years"] = grid["Years"].astype(float)
+        grid.loc[row_index, "Years"] = float(years)
+        return grid, down_payment
+    if variable == "Fixed Payment":
+        grid["Payment %"] = grid["Payment %"].astype(float)
+        grid.loc[row_index, "Payment %"] = 0.0
+    grid[variable] = grid[variable].astype(float)
+    grid.loc[row_index, variable] = float(value)
+    return grid, down_payment
+
+
+def current_value(variable, phases_df, down_payment, row_index=None):
+    if variable == "Down Payment":
+        return float(down_payment)
+    row = phases_df.loc[row_index]
+    if variable == "Years":
+        return int(row["Years"] * FREQ_MAP[row["Frequency"]]) if pd.notna(row["Years"]) else None
+    return float(row[variable]) if pd.notna(row[variable]) and row[variable] > 0 else None
+
+
+def bracketed_root(f, lo, hi, f_lo, f_hi, x0=None, xtol=1e-9, ftol=0.0, integer=False, max_evals=MAX_EVALUATIONS):
+    # f(lo) and f(hi) differ in sign. Illinois false position (bisection on integers); a guess x0
+    # inside the bracket is tried first, so a target near the current input settles in a step or two.
+    # Returns (x, f(x)); on integers the end of the final [n, n + 1] bracket with f <= 0, so a
+    # target read as "at most" is never overshot by rounding.
+    evals = 0
+    side = 0
+    if x0 is not None and lo < x0 < hi:
+        x = x0
+    else:
+        x = None
+    while evals < max_evals:
+        if x is None:
+            if integer:
+                if hi - lo <= 1:
+                    break
+                x = (lo + hi) // 2
+            else:
+                x = hi - f_hi * (hi - lo) / (f_hi - f_lo)
+                if not lo < x < hi:
+                    x = (lo + hi) / 2
+        fx = f(x)
+        evals += 1
+        if abs(fx) <= ftol:
+            return x, fx
+        if np.sign(fx) == np.sign(f_lo):
+            lo, f_lo = x, fx
+            if side == -1:
+                f_hi /= 2
+            side = -1
+        else:
+            hi, f_hi = x, fx
+            if side == 1:
+                f_lo /= 2
+            side = 1
+        if not integer and hi - lo <= xtol * max(1.0, abs(hi) + abs(lo)):
+            break
+        x = None
+    if integer:
+        return (lo, f(lo)) if f(lo) <= 0 else (hi, f(hi))
+    x = hi - f_hi * (hi - lo) / (f_hi - f_lo) if f_hi != f_lo else (lo + hi) / 2
+    return x, f(x)
+
+
+def is_v_shaped(metric, variable, phases_df, row_index=None):
+    # Only a standard row followed by a standard phase that amortizes what it leaves makes a V;
+    # otherwise the recurring payment moves one way with the row's payment
+    if (metric, variable) not in V_SHAPED or phases_df.loc[row_index, "Frequency"] == "Specific Date":
+        return False
+    later = phases_df["Frequency"].iloc[phases_df.index.get_loc(row_index) + 1:]
+    return bool((later != "Specific Date").any())
+
+
+def payment_gap(df_schedule, phases_df, row_index):
+    # The row's own payment minus the largest payment of the standard phases after it. It grows
+    # with the row's payment, and the V bottoms out where it crosses zero.
+    pos = phases_df.index.get_loc(row_index)
+    later = {f"Phase {i + 1}" for i, f in zip(phases_df.index[pos + 1:], phases_df["Frequency"].iloc[pos + 1:])
+             if f != "Specific Date"}
+    own = df_schedule.loc[df_schedule["Phase"] == f"Phase {row_index + 1}", "Payment"]
+    after = df_schedule.loc[df_schedule["Phase"].isin(later), "Payment"]
+    return (float(own.max()) if len(own) else 0.0) - (float(after.max()) if len(after) else 0.0)
+
+
+def _brackets(branch, target, tol):
+    return min(branch[2], branch[3]) - tol <= target <= max(branch[2], branch[3]) + tol
+
+
+@timed("goalseek.solve")
+def goal_seek(variable, metric, target, price, down_payment, discount_rate, phases_df, start_date,
+              row_index=None, cache=None, conventions=None, tol=0.01):
+    # Returns a dict with the solved `value` (periods for Years), its `metric`, a `status` of
+    # "solved", or "below_range"/"above_range" with the closest bound when the target is unreachable,
+    # the reachable metric `range`, the `grid` and `down_payment` to apply, and `evaluations`.
+    row = phases_df.loc[row_index] if GOAL_VARIABLES[variable]["row"] else None
+    if row is not None and variable == "Years" and row["Frequency"] == "Specific Date":
+        raise ValueError("Years only applies to standard-frequency phases")
+    engine = IncrementalSchedule()
+    runs = {}
+    started = time.perf_counter()
+    v_shaped = is_v_shaped(metric, variable, phases_df, row_index)
+
+    def evaluate(x):
+        if x not in runs:
+            grid, down = apply_variable(variable, x, phases_df, down_payment, row_index)
+            extra = {"conventions": conventions} if conventions else {}
+            if cache is None:
+                result = engine.calculate(price, down, discount_rate, grid, start_date, **extra)
+            else:
+                _, result = cached_calculate_schedule(cache, price, down, discount_rate, grid, start_date,
+                                                      engine=engine.calculate, counted=False, **extra)
+            runs[x] = (schedule_metric(metric, *result, grid),
+                       payment_gap(result[0], phases_df, row_index) if v_shaped else None)
+        return runs[x][0]
+
+    def gap(x):
+        evaluate(x)
+        return runs[x][1]
+
+    integer = variable == "Years"
+    lo, hi = variable_bounds(variable, price, down_payment, row)
+    m_lo, m_hi = evaluate(lo), evaluate(hi)
+    x0 = current_value(variable, phases_df, down_payment, row_index)
+    # Pieces of [lo, hi] as (x_lo, x_hi, m_lo, m_hi); a target between the ends of one has a root there
+    branches = [(lo, hi, m_lo, m_hi)]
+    if v_shaped and not _brackets(branches[0], target, tol):
+        # Outside the ends of a V: split it at the current input when that already dips below the
+        # target, else at the bottom, which also bounds the range when nothing reaches the target
+        split = None
+        if target < min(m_lo, m_hi) and x0 is not None and lo < x0 < hi and evaluate(x0) <= target:
+            split = x0
+        elif gap(lo) < 0 < gap(hi):
+            split, _ = bracketed_root(gap, lo, hi, gap(lo), gap(hi), x0=x0, ftol=tol)
+        if split is not None and evaluate(split) < min(m_lo, m_hi):
+            branches = [(lo, split, m_lo, evaluate(split)), (split, hi, evaluate(split), m_hi)]
+    ends = [(x, m) for b in branches for x, m in ((b[0], b[2]), (b[1], b[3]))]
+    reach = (min(m for _, m in ends), max(m for _, m in ends))
+    reachable = [b for b in branches if _brackets(b, target, tol)]
+
+    if not reachable:
+        # Each piece is monotone, so the closest achievable metric is at one of their ends
+        x = min(ends, key=lambda e: abs(e[1] - target))[0]
+        status = "below_range" if target < reach[0] else "above_range"
+    else:
+        # Where both sides of a V reach the target, stay on the side of the current input
+        b_lo, b_hi, f_lo, f_hi = next((b for b in reachable if x0 is not None and b[0] <= x0 <= b[1]), reachable[0])
+        x, _ = bracketed_root(lambda v: evaluate(v) - target, b_lo, b_hi, f_lo - target, f_hi - target,
+                              x0=x0, ftol=tol, integer=integer)
+        status = "solved"
+
+    grid, down = apply_variable(variable, x, phases_df, down_payment, row_index)
+    return {
+        "variable": variable, "metric": metric, "target": float(target),
+        "value": x, "years": x / FREQ_MAP[row["Frequency"]] if integer else None,
+        "achieved": evaluate(x), "status": status, "range": reach,
+        "grid": grid, "down_payment": down,
+        "evaluations": len(runs), "seconds": time.perf_counter() - started,
+    }
@@ -0,0 +1,86 @@
+from finance._lazy import lazy_import
+from finance.engine import phase_block, SCHEDULE_COLUMNS
+from finance.cache import canonical_grid
+from finance.timing import timed
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+# ==========================================
+# INCREMENTAL RECOMPUTATION
+# ==========================================
+# Keeps one checkpoint per grid row: the row's fingerprint, the state it opened with (balance,
+# date, periods so far, NPV so far) and the schedule slice it produced. A new grid reuses every
+# checkpoint up to the first row whose fingerprint changed and only reprices the tail.
+
+
+class IncrementalSchedule:
+    def __init__(self):
+        self.inputs = None
+        self.checkpoints = []
+        self.recomputed_from = 0
+
+    @timed("engine.incremental")
+    def calculate(self, price, down_payment, discount_rate, phases_df, start_date, conventions=None):
+        inputs = (float(price), float(down_payment), float(discount_rate), pd.to_datetime(start_date),
+                  tuple(sorted(conventions.items())) if conventions else None)
+        fingerprints = [tuple(r) for r in canonical_grid(phases_df)]
+
+        reuse = 0
+        if inputs == self.inputs:
+            limit = min(len(fingerprints), len(self.checkpoints))
+            while reuse < limit and self.checkpoints[reuse]["fingerprint"] == fingerprints[reuse]:
+                reuse += 1
+        checkpoints = self.checkpoints[:reuse]
+
+        if checkpoints:
+            last = checkpoints[-1]
+            balance, current_date, anchor = last["end_balance"], last["end_date"], last["end_anchor"]
+            periods, npv, stopped = last["end_periods"], last["end_npv"], last["stopped"]
+        else:
+            balance = np.array([price - down_payment], dtype=float)
+            current_date = inputs[3].to_datetime64()
+            anchor = None
+            periods, npv, stopped = 0, -float(down_payment), False
+
+        disc_log = np.log1p(discount_rate / 100 / 12)
+        prices = np.array([price], dtype=float)
+        rows = list(zip(phases_df.index, phases_df.to_dict('records')))
+
+        for fingerprint, (index, row) in zip(fingerprints[reuse:], rows[reuse:]):
+            checkpoint = {"fingerprint": fingerprint, "opening_balance": balance, "opening_date": current_date,
+                          "opening_periods": periods, "opening_npv": npv, "block": None}
+            stopped = stopped or bool(balance[0] <= 0.1)
+            block = None if stopped else phase_block(index, row, prices, balance, current_date, conventions, anchor)
+            if block is not None:
+                n = block["payment"].shape[1]
+                discount = np.exp(-disc_log * np.arange(periods + 1, periods + n + 1))
+                npv -= float(block["payment"][0] @ discount)
+                balance, current_date, anchor, periods = block["end_balance"], block["end_date"], block["end_anchor"], periods + n
+                checkpoint["block"] = block
+            checkpoint.update(end_balance=balance, end_date=current_date, end_anchor=anchor, end_periods=periods, end_npv=npv, stopped=stopped)
+            checkpoints.append(checkpoint)
+
+        self.inputs, self.checkpoints, self.recomputed_from = inputs, checkpoints, reuse
+        return self.result(down_payment)
+
+    @timed("engine.frame")
+    def result(self, down_payment):
+        blocks = [c["block"] for c in self.checkpoints if c["block"] is not None]
+        if blocks:
+            payment_col = np.concatenate([b["payment"][0] for b in blocks])
+            interest_col = np.concatenate([b["interest"][0] for b in blocks])
+            df_schedule = pd.DataFrame({
+                "Phase": np.concatenate([b["phase"] for b in blocks]),
+                "Payment Date": pd.to_datetime(np.concatenate([b["date"] for b in blocks])),
+                "Payment": payment_col,
+                "Interest": interest_col,
+                "Principal": np.concatenate([b["principal"][0] for b in blocks]),
+                "Balance": np.maximum(np.concatenate([b["balance"][0] for b in blocks]), 0),
+            }, columns=SCHEDULE_COLUMNS)
+        else:
+            payment_col = interest_col = np.zeros(0)
+            df_schedule = pd.DataFrame(columns=SCHEDULE_COLUMNS)
+
+        npv = self.checkpoints[-1]["end_npv"] if self.checkpoints else -float(down_payment)
+        return df_schedule, payment_col.sum() + down_payment, interest_col.sum(), npv
@@ -0,0 +1,76 @@
+import argparse
+import os
+import tempfile
+import threading
+import time
+from collections import Counter
+import bcrypt
+import numpy as np
+
+from finance.users import UserStore, LoginService, RateLimiter
+
+# ==========================================
+# LOGIN LOAD TEST
+# ==========================================
+# N simulated sessions log in concurrently against a throwaway user store and the same
+# LoginService the app uses; reports throughput and latency percentiles.
+
+
+def run_load_test(sessions=50, logins_per_session=4, workers=None, cost=12, bad_password_ratio=0.1, seed=0):
+    password_hash = bcrypt.hashpw(b"secret", bcrypt.gensalt(cost)).decode()
+    users = {f"user{i}": {'name': f"User {i}", 'password': password_hash} for i in range(sessions)}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = UserStore(os.path.join(tmp, "users.sqlite3"), seed=users)
+        service = LoginService(store, max_workers=workers, max_queue=sessions * 2,
+                               limiter=RateLimiter(max_attempts=logins_per_session + 1))
+        rng = np.random.default_rng(seed)
+        bad = rng.random((sessions, logins_per_session)) < bad_password_ratio
+        latencies = [[] for _ in range(sessions)]
+        outcomes = [Counter() for _ in range(sessions)]
+        start_gate = threading.Barrier(sessions + 1)
+
+        def session(i):
+            start_gate.wait()
+            for k in range(logins_per_session):
+                t0 = time.perf_counter()
+                outcome = service.verify(f"user{i}", "wrong" if bad[i, k] else "secret")
+                latencies[i].append(time.perf_counter() - t0)
+                outcomes[i][outcome] += 1
+
+        threads = [threading.Thread(target=session, args=(i,)) for i in range(sessions)]
+        for t in threads:
+            t.start()
+        start_gate.wait()
+        t_start = time.perf_counter()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - t_start
+
+    lat = np.concatenate([np.asarray(l) for l in latencies]) * 1000
+    return {
+        "sessions": sessions, "logins": int(lat.size), "seconds": elapsed,
+        "logins_per_sec": lat.size / elapsed,
+        "p50_ms": float(np.percentile(lat, 50)), "p95_ms": float(np.percentile(lat, 95)),
+        "p99_ms": float(np.percentile(lat, 99)), "max_ms": float(lat.max()),
+        "outcomes": dict(sum(outcomes, Counter())),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate concurrent logins against the bcrypt login service.")
+    parser.add_argument("--sessions", type=int, default=50, help="Concurrent simulated sessions")
+    parser.add_argument("--logins", type=int, default=4, help="Logins per session")
+    parser.add_argument("--workers", type=int, default=None, help="bcrypt worker threads")
+    parser.add_argument("--cost", type=int, default=12, help="bcrypt cost factor of the test accounts")
+    args = parser.parse_args(argv)
+
+    r = run_load_test(args.sessions, args.logins, args.workers, args.cost)
+    print(f"{r['logins']} logins from {r['sessions']} sessions in {r['seconds']:.2f}s")
+    print(f"throughput: {r['logins_per_sec']:.1f} logins/s")
+    print(f"latency ms: p50 {r['p50_ms']:.0f} | p95 {r['p95_ms']:.0f} | p99 {r['p99_ms']:.0f} | max {r['max_ms']:.0f}")
+    print(f"outcomes: {r['outcomes']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+from finance._lazy import lazy_import
+from finance.engine import FREQ_MAP, phase_payment, annuity_payment, amortize
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+# ==========================================
+# MONTE CARLO INTEREST-RATE SIMULATION
+# ==========================================
+# Floating phases follow one seeded rate process sampled once per payment period. Each path is
+# a row of a (paths x periods) array; paths are processed in chunks sized to a byte budget.
+RATE_MODELS = ["Vasicek", "Lognormal"]
+PERCENTILES = [5, 50, 95]
+ARRAYS_PER_PERIOD = 8
+
+
+def build_plan(price, phases_df, floating=()):
+    # Mirrors the engine's phase walk; floating only applies to standard-frequency phases.
+    plan = []
+    for index, row in zip(phases_df.index, phases_df.to_dict('records')):
+        payment, is_fixed_input = phase_payment(row, price)
+        step = {"label": f"Phase {index + 1}", "rate": row['Interest Rate %'] / 100,
+                "payment": payment if is_fixed_input else None}
+        if row['Frequency'] == 'Specific Date':
+            target_date = pd.to_datetime(row['Target Date'])
+            if pd.isna(target_date): continue
+            plan.append(dict(step, kind="date", target_date=target_date, periods=1))
+        else:
+            if pd.isna(row['Years']) or row['Years'] <= 0: continue
+            n_per_year = FREQ_MAP[row['Frequency']]
+            total_periods = int(row['Years'] * n_per_year)
+            if total_periods == 0: continue
+            plan.append(dict(step, kind="floating" if step["label"] in floating else "fixed",
+                             n_per_year=n_per_year, periods=total_periods))
+    return plan
+
+
+def simulate_rates(rng, n_paths, r0, dt, model="Vasicek", volatility=0.01, mean_reversion=0.1, long_run_mean=None):
+    # Annual rate in force for each period (paths x len(dt)); every path starts at r0.
+    dt = np.asarray(dt, dtype=float)
+    z = rng.standard_normal((n_paths, len(dt)))
+    if model == "Lognormal":
+        steps = volatility * np.sqrt(dt) * z - 0.5 * volatility**2 * dt
+        level = r0 * np.exp(np.cumsum(steps, axis=1))
+    else:
+        theta = r0 if long_run_mean is None else long_run_mean
+        if mean_reversion > 0:
+            decay = np.exp(-mean_reversion * dt)
+            scale = volatility * np.sqrt(-np.expm1(-2 * mean_reversion * dt) / (2 * mean_reversion))
+        else:
+            decay = np.ones_like(dt)
+            scale = volatility * np.sqrt(dt)
+        level = np.empty_like(z)
+        r = np.full(n_paths, float(r0))
+        for k in range(len(dt)):
+            r = r * decay[k] + theta * (1 - decay[k]) + scale[k] * z[:, k]
+            level[:, k] = r
+    return np.concatenate((np.full((n_paths, 1), float(r0)), level[:, :-1]), axis=1)
+
+
+def _floating_block(balance, rates_per_period, payment):
+    growth = 1 + rates_per_period
+    if payment is None:
+        # Re-amortize over the remaining term every period: B_k = B_{k-1} * (1 + r_k - a_k),
+        # a_k being the annuity factor, so the whole block is one cumulative product.
+        remaining = np.arange(rates_per_period.shape[1], 0, -1, dtype=float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            factor = np.where(np.abs(rates_per_period) < 1e-12, 1 / remaining,
+                              rates_per_period / -np.expm1(-remaining * np.log1p(rates_per_period)))
+        closing = balance[:, None] * np.cumprod(growth - factor, axis=1)
+        opening = np.concatenate((balance[:, None], closing[:, :-1]), axis=1)
+        payments = opening * factor
+    else:
+        # Fixed payment: B_k = G_k * (B_0 - P * sum_{j<=k} 1/G_j) with G_k the cumulative growth.
+        cumulative = np.cumprod(growth, axis=1)
+        closing = cumulative * (balance[:, None] - payment * np.cumsum(1 / cumulative, axis=1))
+        opening = np.concatenate((balance[:, None], closing[:, :-1]), axis=1)
+        payments = np.broadcast_to(np.asarray(payment, dtype=float), closing.shape)
+    return payments, opening * rates_per_period, closing
+
+
+def _simulate_chunk(plan, price, down_payment, discount_rate, start_date, rates):
+    n_paths = rates.shape[0]
+    balance = np.full(n_paths, float(price - down_payment))
+    active = np.ones(n_paths, dtype=bool)
+    total_interest = np.zeros(n_paths)
+    npv = np.full(n_paths, -float(down_payment))
+    peak = np.zeros(n_paths)
+    current_date = pd.to_datetime(start_date)
+    disc_log = np.log1p(discount_rate / 100 / 12)
+    period, column = 0, 0
+    first_rate = next((s["rate"] for s in plan if s["kind"] == "floating"), 0.0)
+
+    for step in plan:
+        active = active & ~(balance <= 0.1)
+        if not active.any(): break
+
+        if step["kind"] == "date":
+            days_diff = max((step["target_date"] - current_date).days, 0)
+            interest = balance * step["rate"] * (days_diff / 365.25)
+            payment = step["payment"] if step["payment"] is not None else balance + interest
+            payments = np.broadcast_to(payment, balance.shape)[:, None]
+            interest = interest[:, None]
+            closing = balance[:, None] - (payments - interest)
+            current_date = step["target_date"]
+        elif step["kind"] == "floating":
+            phase_rates = rates[:, column:column + step["periods"]] + (step["rate"] - first_rate)
+            column += step["periods"]
+            payments, interest, closing = _floating_block(balance, phase_rates / step["n_per_year"], step["payment"])
+        else:
+            rate_per_period = step["rate"] / step["n_per_year"]
+            payment = step["payment"]
+            if payment is None:
+                payment = annuity_payment(balance, rate_per_period, step["periods"])
+            interest, _, closing = amortize(balance, rate_per_period, step["periods"], payment)
+            payments = np.broadcast_to(np.asarray(payment, dtype=float)[..., None], interest.shape)
+
+        if step["kind"] != "date":
+            current_date = current_date + pd.Timedelta(days=int(365.25 / step["n_per_year"]) * step["periods"])
+
+        discount = np.exp(-disc_log * np.arange(period + 1, period + step["periods"] + 1))
+        total_interest += np.where(active, interest.sum(axis=1), 0)
+        npv -= np.where(active, payments @ discount, 0)
+        peak = np.where(active, np.maximum(peak, payments.max(axis=1)), peak)
+        balance = closing[:, -1]
+        period += step["periods"]
+
+    return total_interest, npv, peak
+
+
+def simulate(price, down_payment, discount_rate, phases_df, start_date, floating, n_paths=10000, seed=0,
+             model="Vasicek", volatility=0.01, mean_reversion=0.1, long_run_mean=None, max_bytes=128 * 1024 * 1024):
+    # Rates are annual decimals (0.01 = 1 point of Vasicek volatility; Lognormal volatility is relative).
+    plan = build_plan(price, phases_df, floating)
+    floating_steps = [s for s in plan if s["kind"] == "floating"]
+    dt = np.concatenate([np.full(s["periods"], 1 / s["n_per_year"]) for s in floating_steps]) if floating_steps else np.zeros(0)
+    r0 = floating_steps[0]["rate"] if floating_steps else 0.0
+
+    total_periods = max(sum(s["periods"] for s in plan), 1)
+    chunk = int(max(1, min(n_paths, max_bytes // (total_periods * 8 * ARRAYS_PER_PERIOD))))
+    rng = np.random.default_rng(seed)
+
+    results = {"total_interest": np.empty(n_paths), "npv": np.empty(n_paths), "peak_payment": np.empty(n_paths)}
+    for start in range(0, n_paths, chunk):
+        size = min(chunk, n_paths - start)
+        rates = simulate_rates(rng, size, r0, dt, model, volatility, mean_reversion, long_run_mean)
+        chunk_results = _simulate_chunk(plan, price, down_payment, discount_rate, start_date, rates)
+        for key, values in zip(results, chunk_results):
+            results[key][start:start + size] = values
+    return results
+
+
+def summarize(results, percentiles=PERCENTILES):
+    return pd.DataFrame(
+        {key: np.percentile(values, percentiles) for key, values in results.items()},
+        index=[f"P{p}" for p in percentiles],
+    )
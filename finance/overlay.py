@@ -0,0 +1,58 @@
+from finance._lazy import lazy_import
+from finance.charts import BAR_POINT_BUDGET, BUCKET_MONTHS, span_bucket
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+# ==========================================
+# MULTI-SCENARIO OVERLAY
+# ==========================================
+# Lines N stored schedules up on one calendar index. All schedules are stacked once, every row
+# gets a flat (bucket, scenario) slot, and a single groupby fills a (buckets x scenarios) block;
+# no per-scenario loop, so a page of 50+ long schedules stays interactive.
+OVERLAY_VIEWS = {
+    "CUMULATIVE PAID": "cumulative",
+    "OUTSTANDING BALANCE": "balance",
+    "PAYMENTS PER PERIOD": "payments",
+    "PAYMENT DIFFERENCE": "difference",
+}
+
+
+def align_schedules(schedules, opening_balances, down_payments, baseline=None, freq=None, budget=BAR_POINT_BUDGET):
+    # schedules: {label: schedule_df}; opening_balances / down_payments: one per label, same order.
+    # Returns ({view: DataFrame(bucket start x label)}, freq). Before its first payment a scenario
+    # owes its opening balance, after its last one the final balance carries forward. The
+    # difference view is each scenario's payments minus `baseline`'s (default: the first label).
+    labels = list(schedules)
+    lengths = np.array([len(df) for df in schedules.values()])
+    stacked = pd.concat([df[["Payment Date", "Payment", "Balance"]] for df in schedules.values()], ignore_index=True)
+    months = stacked["Payment Date"].to_numpy().astype('datetime64[M]').astype(np.int64)
+    n = len(labels)
+    if not len(months):
+        # Every schedule is empty: empty frames (on the requested or a monthly index)
+        freq, first_slot, n_slots = freq or "M", 0, 0
+        slot = months
+    else:
+        if freq is None:
+            first, last = (pd.Timestamp(m.astype('datetime64[M]')) for m in (months.min(), months.max()))
+            freq = span_bucket(first, last, budget)
+        slot = months // BUCKET_MONTHS[freq]
+        first_slot = int(slot.min())
+        n_slots = int(slot.max()) - first_slot + 1
+    step = BUCKET_MONTHS[freq]
+
+    flat = (slot - first_slot) * n + np.repeat(np.arange(n), lengths)
+    grouped = stacked.groupby(flat, sort=False)
+    payments = np.zeros(n_slots * n)
+    balances = np.full(n_slots * n, np.nan)
+    sums, lasts = grouped["Payment"].sum(), grouped["Balance"].last()
+    payments[sums.index.to_numpy()] = sums.to_numpy()
+    balances[lasts.index.to_numpy()] = lasts.to_numpy()
+
+    index = pd.DatetimeIndex(((np.arange(n_slots) + first_slot) * step).astype('datetime64[M]'), name="Payment Date")
+    payments = pd.DataFrame(payments.reshape(n_slots, n), index=index, columns=labels)
+    balance = pd.DataFrame(balances.reshape(n_slots, n), index=index, columns=labels).ffill()
+    balance = balance.fillna(pd.Series(np.asarray(opening_balances, dtype=float), index=labels))
+    cumulative = payments.cumsum() + np.asarray(down_payments, dtype=float)
+    difference = payments.sub(payments[labels[0] if baseline is None else baseline], axis=0)
+    return {"cumulative": cumulative, "balance": balance, "payments": payments, "difference": difference}, freq
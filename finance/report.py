@@ -0,0 +1,180 @@
+import contextvars
+import hashlib
+import threading
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from finance._lazy import lazy_import
+from finance.timing import timed
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+fpdf = lazy_import("fpdf")
+
+# ==========================================
+# PDF REPORT GENERATOR
+# ==========================================
+# Renders the whole schedule: the table header repeats on every page and each calendar year
+# closes with a subtotal row. Built in a background worker and cached by result hash.
+TABLE_COLUMNS = [("Date", 28), ("Phase", 22), ("Payment", 35), ("Interest", 35), ("Principal", 35), ("Balance", 35)]
+ROW_HEIGHT = 6
+
+
+def pdf_text(text):
+    # The core PDF fonts are latin-1 only; anything else (e.g. the euro sign) would abort the build.
+    return str(text).encode('latin-1', 'replace').decode('latin-1')
+
+
+def format_amounts(values):
+    return [f"{v:,.0f}" for v in np.asarray(values, dtype=float).tolist()]
+
+
+@functools.lru_cache(maxsize=None)
+def pdf_class():
+    # Defined on first use so fpdf is only imported by processes that actually build reports
+    class PDF(fpdf.FPDF):
+        in_table = False
+
+        def header(self):
+            self.set_font('Arial', 'B', 14)
+            self.cell(0, 10, 'INVESTMENT ANALYSIS REPORT', 0, 1, 'C')
+            self.ln(5)
+            if self.in_table:
+                self.table_header()
+
+        def footer(self):
+            self.set_y(-15)
+            self.set_font('Arial', 'I', 8)
+            self.cell(0, 10, f'Page {self.page_no()} of {{nb}}', 0, 0, 'C')
+
+        def table_header(self):
+            self.set_font("Arial", 'B', 9)
+            self.set_fill_color(17, 17, 17)
+            self.set_text_color(255, 255, 255)
+            for label, width in TABLE_COLUMNS:
+                self.cell(width, 8, label, 1, 0, 'C', 1)
+            self.ln()
+            self.set_text_color(0, 0, 0)
+            self.set_font("Arial", '', 8)
+
+    return PDF
+
+
+@timed("report.pdf")
+def create_pdf(project_name, currency_symbol, t_cost, t_int, npv, price, down, df_schedule, start_date):
+    currency_symbol = pdf_text(currency_symbol)
+    pdf = pdf_class()()
+    pdf.alias_nb_pages()
+    pdf.set_auto_page_break(True, margin=20)
+    pdf.add_page()
+
+    pdf.set_font("Arial", 'B', 12)
+    pdf.cell(0, 10, pdf_text(f"PROJECT: {project_name}"), 0, 1)
+    pdf.set_font("Arial", 'I', 10)
+    pdf.cell(0, 10, f"Start Date: {start_date.strftime('%B %d, %Y')}", 0, 1)
+    pdf.ln(5)
+
+    pdf.set_fill_color(250, 250, 250)
+    pdf.set_font("Arial", '', 10)
+    pdf.cell(95, 8, f"Property Price: {currency_symbol}{price:,.0f}", 1, 0, 'L', 1)
+    pdf.cell(95, 8, f"Down Payment: {currency_symbol}{down:,.0f}", 1, 1, 'L', 1)
+
+    pdf.set_font("Arial", 'B', 10)
+    pdf.cell(63, 10, f"TOTAL COST: {currency_symbol}{t_cost:,.0f}", 1, 0, 'L')
+    pdf.cell(63, 10, f"TOTAL INTEREST: {currency_symbol}{t_int:,.0f}", 1, 0, 'L')
+    pdf.cell(64, 10, f"NPV: {currency_symbol}{npv:,.0f}", 1, 1, 'L')
+    pdf.ln(10)
+
+    pdf.set_font("Arial", 'B', 11)
+    pdf.cell(0, 10, f"PAYMENT SCHEDULE ({len(df_schedule):,} PAYMENTS)", 0, 1)
+    pdf.in_table = True
+    pdf.table_header()
+
+    if not df_schedule.empty:
+        dates = pd.to_datetime(df_schedule['Payment Date'])
+        years = dates.dt.year.to_numpy()
+        cols = [
+            dates.dt.strftime('%b %d, %Y').tolist(),
+            [pdf_text(p) for p in df_schedule['Phase'].tolist()],
+            format_amounts(df_schedule['Payment']),
+            format_amounts(df_schedule['Interest']),
+            format_amounts(df_schedule['Principal']),
+            format_amounts(df_schedule['Balance']),
+        ]
+        widths = [w for _, w in TABLE_COLUMNS]
+        aligns = ['L', 'L', 'R', 'R', 'R', 'R']
+
+        # Per-year subtotals, computed once and written after the last row of each year
+        year_ends = np.flatnonzero(np.append(years[1:] != years[:-1], True))
+        sums = df_schedule.groupby(years, sort=False)[['Payment', 'Interest', 'Principal']].sum()
+
+        row_start = 0
+        for year_end in year_ends:
+            for i in range(row_start, year_end + 1):
+                for col, width, align in zip(cols, widths, aligns):
+                    pdf.cell(width, ROW_HEIGHT, col[i], 1, 0, align)
+                pdf.ln()
+            year = years[year_end]
+            pdf.set_font("Arial", 'B', 8)
+            pdf.set_fill_color(245, 240, 228)
+            pdf.cell(widths[0] + widths[1], ROW_HEIGHT, f"{year} SUBTOTAL", 1, 0, 'L', 1)
+            for name, width in zip(['Payment', 'Interest', 'Principal'], widths[2:5]):
+                pdf.cell(width, ROW_HEIGHT, f"{sums.loc[year, name]:,.0f}", 1, 0, 'R', 1)
+            pdf.cell(widths[5], ROW_HEIGHT, "", 1, 1, 'R', 1)
+            pdf.set_font("Arial", '', 8)
+            row_start = year_end + 1
+
+    pdf.in_table = False
+    return pdf.output(dest='S').encode('latin-1')
+
+
+# --- BACKGROUND BUILDS ---
+def report_key(result_key, project_name, currency_symbol):
+    return "pdf:" + hashlib.sha256(f"{result_key}|{project_name}|{currency_symbol}".encode()).hexdigest()
+
+
+class ReportBuilder:
+    # Runs create_pdf on a small worker pool and parks finished bytes in a shared ResultCache.
+    def __init__(self, cache, max_workers=2):
+        self.cache = cache
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="pdf-report")
+        self._pending = {}
+        self._lock = threading.RLock()
+
+    def request(self, key, *args):
+        with self._lock:
+            future = self._pending.get(key)
+            if future is None or (future.done() and future.exception() is not None):
+                # The worker inherits the caller's context so the build shows up in its timing spans
+                future = self._pool.submit(contextvars.copy_context().run, create_pdf, *args)
+                self._pending[key] = future
+                future.add_done_callback(lambda f: self._finish(key, f))
+        return future
+
+    def _finish(self, key, future):
+        # Failed builds stay pending so status() can report them until the next request
+        if future.exception() is None:
+            self.cache.put(key, future.result())
+            with self._lock:
+                if self._pending.get(key) is future:
+                    del self._pending[key]
+
+    def status(self, key):
+        # One of "ready", "running", "failed" or None (never requested, or evicted since)
+        with self._lock:
+            future = self._pending.get(key)
+        if future is not None:
+            if not future.done():
+                return "running"
+            return "failed" if future.exception() is not None else "ready"
+        return "ready" if key in self.cache else None
+
+    def result(self, key):
+        # Status polling reads the bytes on every rerun, so it must not skew the cache's hit stats
+        value = self.cache.peek(key)
+        if value is None:
+            with self._lock:
+                future = self._pending.get(key)
+            if future is not None and future.done() and future.exception() is None:
+                value = future.result()
+        return value
@@ -0,0 +1,228 @@
+import io
+import json
+import os
+import sqlite3
+from contextlib import contextmanager
+from datetime import date
+
+from finance._lazy import lazy_import
+from finance.cashflows import schedule_metrics
+
+pd = lazy_import("pandas")
+
+# ==========================================
+# PERSISTENT SCENARIO STORE
+# ==========================================
+# One SQLite file holds every user's snapshots. Metrics live in indexed columns so the comparison
+# board can sort and page without touching the payloads; the grid and schedule are Parquet blobs
+# that are only read back when a scenario is loaded. Schedules are stored typed and compact
+# (float64 amounts, datetime64 dates, a categorical phase) so they come back ready for overlays.
+# XNPV/XIRR are solved once at save time and stored with the other metrics; xnpv is NULL only
+# for scenarios without a schedule or saved before the current METRICS_VERSION (see backfill_metrics).
+DEFAULT_DB_PATH = os.environ.get("SCENARIO_DB_PATH", os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "scenarios.sqlite3"))
+SORT_COLUMNS = ["created_at", "name", "cost", "interest", "npv"]
+META_COLUMNS = ["id", "name", "created_at", "cost", "interest", "npv", "xnpv", "xirr", "currency", "currency_symbol",
+                "has_schedule"]
+
+TABLE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS scenarios (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    username TEXT NOT NULL,
+    name TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    cost REAL NOT NULL,
+    interest REAL NOT NULL,
+    npv REAL NOT NULL,
+    xnpv REAL,
+    xirr REAL,
+    has_schedule INTEGER NOT NULL DEFAULT 0,
+    currency TEXT NOT NULL,
+    currency_symbol TEXT NOT NULL,
+    inputs TEXT NOT NULL,
+    grid BLOB NOT NULL,
+    schedule BLOB
+);
+"""
+SCHEMA = TABLE_SCHEMA + """
+CREATE INDEX IF NOT EXISTS idx_scenarios_user_created ON scenarios (username, created_at);
+CREATE INDEX IF NOT EXISTS idx_scenarios_user_name ON scenarios (username, name);
+CREATE INDEX IF NOT EXISTS idx_scenarios_user_cost ON scenarios (username, cost);
+CREATE INDEX IF NOT EXISTS idx_scenarios_user_interest ON scenarios (username, interest);
+CREATE INDEX IF NOT EXISTS idx_scenarios_user_npv ON scenarios (username, npv);
+"""
+# Columns added after the first release and how older stores fill them in
+MIGRATIONS = {"xnpv": "NULL", "xirr": "NULL", "has_schedule": "schedule IS NOT NULL"}
+# Stored as the file's user_version; bumped when the XNPV/XIRR definition changes so that older
+# values are cleared and backfilled (1: past-dated rows on the engine's accrual clock)
+METRICS_VERSION = 1
+
+
+def frame_to_blob(df):
+    buf = io.BytesIO()
+    df.to_parquet(buf, index=True, compression="zstd")
+    return buf.getvalue()
+
+
+def blob_to_frame(blob):
+    return pd.read_parquet(io.BytesIO(blob))
+
+
+def compact_schedule(df):
+    # Phase labels repeat on every row: as a categorical they are stored once per row group
+    out = df.reset_index(drop=True)
+    out["Phase"] = out["Phase"].astype("category")
+    out["Payment Date"] = pd.to_datetime(out["Payment Date"])
+    amounts = [c for c in out.columns if c not in ("Phase", "Payment Date")]
+    out[amounts] = out[amounts].astype("float64")
+    return out
+
+
+def _optional_float(value):
+    # SQLite stores NaN as NULL anyway; say so explicitly
+    return None if value is None or value != value else float(value)
+
+
+class ScenarioStore:
+    def __init__(self, path=DEFAULT_DB_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            self._migrate(conn)
+
+    @contextmanager
+    def _connect(self):
+        # A short-lived connection per call keeps the store safe to share across session threads
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _migrate(self, conn):
+        # Older stores are rebuilt rather than given ALTER TABLE ADD COLUMN: appended columns would
+        # sit behind the blobs, and SQLite walks a row's blob overflow pages to read them
+        existing = [row[1] for row in conn.execute("PRAGMA table_info(scenarios)")]
+        if not all(column in existing for column in MIGRATIONS):
+            conn.execute("BEGIN")
+            conn.execute("ALTER TABLE scenarios RENAME TO scenarios_old")
+            conn.execute(TABLE_SCHEMA)
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(scenarios)")]
+            values = [c if c in existing else MIGRATIONS[c] for c in columns]
+            conn.execute(f"INSERT INTO scenarios ({', '.join(columns)}) SELECT {', '.join(values)} FROM scenarios_old")
+            conn.execute("DROP TABLE scenarios_old")
+            conn.commit()
+            conn.executescript(SCHEMA)
+        if conn.execute("PRAGMA user_version").fetchone()[0] < METRICS_VERSION:
+            conn.execute("UPDATE scenarios SET xnpv = NULL, xirr = NULL")
+            conn.execute(f"PRAGMA user_version = {METRICS_VERSION}")
+            conn.commit()
+
+    def save(self, username, name, cost, interest, npv, currency, currency_symbol, inputs, grid_df, schedule_df=None,
+             xnpv=None, xirr=None):
+        # xnpv/xirr are solved from the schedule when not passed in (inputs need price,
+        # down_payment, discount_rate and start_date)
+        if schedule_df is not None and xnpv is None:
+            (xnpv,), (xirr,) = schedule_metrics([schedule_df], [inputs["price"]], [inputs["down_payment"]],
+                                                [inputs["discount_rate"]], [inputs["start_date"]])
+        inputs = dict(inputs)
+        if isinstance(inputs.get("start_date"), date):
+            inputs["start_date"] = inputs["start_date"].isoformat()
+        with self._connect() as conn:
+            cur = conn.execute(
+                "INSERT INTO scenarios (username, name, created_at, cost, interest, npv, xnpv, xirr, has_schedule, currency, "
+                "currency_symbol, inputs, grid, schedule) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (username, name, pd.Timestamp.now().isoformat(), float(cost), float(interest), float(npv),
+                 _optional_float(abs(xnpv) if xnpv is not None else None), _optional_float(xirr), int(schedule_df is not None),
+                 currency, currency_symbol, json.dumps(inputs), frame_to_blob(grid_df),
+                 None if schedule_df is None else frame_to_blob(compact_schedule(schedule_df))),
+            )
+            return cur.lastrowid
+
+    def backfill_metrics(self, username, scenario_ids):
+        # Solves XNPV/XIRR once for scenarios that have a schedule but no stored metrics (saved
+        # before the columns existed or under an older METRICS_VERSION); returns how many were filled in
+        ids = [int(i) for i in scenario_ids]
+        if not ids:
+            return 0
+        with self._connect() as conn:
+            missing = [row[0] for row in conn.execute(
+                f"SELECT id FROM scenarios WHERE username = ? AND id IN ({', '.join('?' * len(ids))}) "
+                "AND xnpv IS NULL AND has_schedule", (username, *ids)
+            )]
+        if not missing:
+            return 0
+        schedules = self.load_schedules(username, missing)
+        inputs = [schedules[i][0] for i in missing]
+        xnpvs, xirrs = schedule_metrics([schedules[i][1] for i in missing], [x["price"] for x in inputs],
+                                        [x["down_payment"] for x in inputs], [x["discount_rate"] for x in inputs],
+                                        [x["start_date"] for x in inputs])
+        with self._connect() as conn:
+            conn.executemany("UPDATE scenarios SET xnpv = ?, xirr = ? WHERE id = ?",
+                             [(abs(float(v)), _optional_float(r), i) for i, v, r in zip(missing, xnpvs, xirrs)])
+        return len(missing)
+
+    def count(self, username):
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM scenarios WHERE username = ?", (username,)).fetchone()[0]
+
+    def list(self, username, order_by="created_at", descending=True, limit=50, offset=0):
+        if order_by not in SORT_COLUMNS:
+            raise ValueError(f"Cannot sort scenarios by {order_by!r}")
+        direction = "DESC" if descending else "ASC"
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT {', '.join(META_COLUMNS)} FROM scenarios WHERE username = ? "
+                f"ORDER BY {order_by} {direction}, id {direction} LIMIT ? OFFSET ?",
+                (username, int(limit), int(offset)),
+            ).fetchall()
+        frame = pd.DataFrame(rows, columns=META_COLUMNS).astype({"xnpv": float, "xirr": float})
+        frame["has_schedule"] = frame["has_schedule"].astype(bool)
+        return frame
+
+    def load(self, username, scenario_id):
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT name, inputs, grid FROM scenarios WHERE username = ? AND id = ?", (username, scenario_id)
+            ).fetchone()
+        if row is None:
+            return None
+        inputs = json.loads(row[1])
+        inputs["start_date"] = date.fromisoformat(inputs["start_date"])
+        inputs["grid_df"] = blob_to_frame(row[2])
+        return {"name": row[0], "inputs": inputs}
+
+    def load_schedule(self, username, scenario_id):
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT schedule FROM scenarios WHERE username = ? AND id = ?", (username, scenario_id)
+            ).fetchone()
+        return None if row is None or row[0] is None else blob_to_frame(row[0])
+
+    def load_schedules(self, username, scenario_ids):
+        # {id: (inputs, schedule_df)} for a page of scenarios in one query; ids without a stored
+        # schedule are left out
+        ids = [int(i) for i in scenario_ids]
+        if not ids:
+            return {}
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT id, inputs, schedule FROM scenarios WHERE username = ? AND id IN ({', '.join('?' * len(ids))}) "
+                "AND schedule IS NOT NULL", (username, *ids)
+            ).fetchall()
+        out = {}
+        for scenario_id, inputs, blob in rows:
+            inputs = json.loads(inputs)
+            inputs["start_date"] = date.fromisoformat(inputs["start_date"])
+            out[scenario_id] = (inputs, blob_to_frame(blob))
+        return out
+
+    def delete(self, username, scenario_id):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM scenarios WHERE username = ? AND id = ?", (username, scenario_id))
+
+    def delete_all(self, username):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM scenarios WHERE username = ?", (username,))
@@ -0,0 +1,165 @@
+import atexit
+import itertools
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+from finance._lazy import lazy_import
+from finance.batch import grid_records, price_structure, POOL_MIN_STRUCTURES, TOTAL_COLUMNS
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+# ==========================================
+# SENSITIVITY SWEEP
+# ==========================================
+# Deal-level inputs (price, down payment, discount rate, interest rate) vary inside one
+# (deals x rows) block: none of them moves a payment date. The term changes the phase structure,
+# so each distinct term is its own block and those blocks are spread over a process pool when
+# there are enough of them.
+SWEEP_PARAMETERS = {
+    "Interest Rate %": {"level": "deal", "default": (3.0, 8.0), "help": "Replaces the rate of every phase."},
+    "Term (Years)": {"level": "grid", "default": (10.0, 30.0), "help": "Replaces the duration of the last standard-frequency phase."},
+    "Down Payment %": {"level": "deal", "default": (10.0, 40.0), "help": "Down payment as % of price."},
+    "Discount Rate %": {"level": "deal", "default": (2.0, 8.0), "help": "Inflation / discount rate used for NPV."},
+    "Price": {"level": "deal", "default": None, "help": "Property price."},
+}
+
+
+def apply_grid_overrides(phases_df, rate=None, term=None):
+    grid = phases_df.copy()
+    if rate is not None:
+        grid["Interest Rate %"] = float(rate)
+    if term is not None:
+        standard = grid.index[grid["Frequency"] != "Specific Date"]
+        if len(standard):
+            grid["Years"] = grid["Years"].astype(float)
+            grid.loc[standard[-1], "Years"] = float(term)
+    return grid
+
+
+def sweep_tasks(price, down_payment, discount_rate, phases_df, start_date, axes, conventions=None):
+    # `axes` is an ordered {parameter: values}; combos are laid out in C order of that shape.
+    names = list(axes)
+    mesh = np.meshgrid(*[np.asarray(axes[n], dtype=float) for n in names], indexing='ij')
+    flat = {n: m.ravel() for n, m in zip(names, mesh)}
+    size = mesh[0].size if mesh else 1
+
+    prices = flat.get("Price", np.full(size, float(price)))
+    if "Down Payment %" in flat:
+        down_payments = prices * flat["Down Payment %"] / 100
+    else:
+        down_payments = np.full(size, float(down_payment))
+    discount_rates = flat.get("Discount Rate %", np.full(size, float(discount_rate)))
+
+    rates = flat.get("Interest Rate %")
+
+    terms = flat["Term (Years)"].tolist() if "Term (Years)" in flat else [None] * size
+    structures = {}
+    for pos, term in enumerate(terms):
+        structures.setdefault(term, []).append(pos)
+
+    tasks = []
+    for term, pos in structures.items():
+        grid = apply_grid_overrides(phases_df, term=term)
+        pos = np.asarray(pos)
+        tasks.append((pos, (grid_records(grid), start_date, prices[pos], down_payments[pos], discount_rates[pos], False,
+                            conventions, None if rates is None else rates[pos])))
+    return tasks
+
+
+def _price_block(args):
+    totals, _ = price_structure(*args)
+    return totals
+
+
+# One pool per process, shared by every sweep. spawn, not fork: the dashboard server that runs
+# sweeps has threads of its own.
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool(workers=None):
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=workers or os.cpu_count(),
+                                        mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def reset_pool(broken):
+    # A pool with a dead worker never recovers: forget it (unless another sweep already has) so
+    # the next sweep spawns a fresh one
+    global _pool
+    with _pool_lock:
+        if _pool is broken:
+            _pool = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+@atexit.register
+def shutdown_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def iter_sweep(price, down_payment, discount_rate, phases_df, start_date, axes, workers=None, conventions=None):
+    # Yields (fraction_done, results) after every finished block; `results` maps each total
+    # to an array shaped like the axes, with NaN where a block has not come back yet.
+    shape = tuple(len(v) for v in axes.values())
+    results = {col: np.full(shape, np.nan) for col in TOTAL_COLUMNS}
+    tasks = sweep_tasks(price, down_payment, discount_rate, phases_df, start_date, axes, conventions)
+    total = sum(len(pos) for pos, _ in tasks)
+    done = 0
+
+    def merge(pos, totals):
+        for col in TOTAL_COLUMNS:
+            results[col].flat[pos] = totals[col]
+        return done + len(pos)
+
+    finished = set()
+    if workers != 1 and len(tasks) >= POOL_MIN_STRUCTURES:
+        pool = get_pool(workers)
+        futures = {}
+        try:
+            for i, (pos, args) in enumerate(tasks):
+                futures[pool.submit(_price_block, args)] = i
+            for future in as_completed(futures):
+                i = futures[future]
+                done = merge(tasks[i][0], future.result())
+                finished.add(i)
+                yield done / total, results
+        except BrokenProcessPool:
+            # A worker died or could not start: the blocks still missing are priced below
+            reset_pool(pool)
+        finally:
+            # A rerun closes the generator mid-sweep: drop the blocks that have not started
+            for future in futures:
+                future.cancel()
+    for i, (pos, args) in enumerate(tasks):
+        if i not in finished:
+            done = merge(pos, _price_block(args))
+            yield done / total, results
+
+
+def run_sweep(price, down_payment, discount_rate, phases_df, start_date, axes, workers=None, conventions=None):
+    results = None
+    for _, results in iter_sweep(price, down_payment, discount_rate, phases_df, start_date, axes, workers, conventions):
+        pass
+    return results
+
+
+def sweep_frame(axes, results, fixed=None):
+    # Long-form table of every combo, optionally sliced at {parameter: value} for the extra axes.
+    names = list(axes)
+    index = pd.MultiIndex.from_tuples(list(itertools.product(*axes.values())), names=names)
+    frame = pd.DataFrame({col: results[col].ravel() for col in TOTAL_COLUMNS}, index=index).reset_index()
+    for name, value in (fixed or {}).items():
+        frame = frame[np.isclose(frame[name], value)]
+    return frame
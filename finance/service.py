@@ -0,0 +1,354 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import multiprocessing
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
+
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+from finance._lazy import lazy_import
+from finance.batch import grid_records, phases_frame, run_batch
+from finance.dates import ANCHORS, CALENDARS, DAY_COUNTS, ROLLS, make_conventions
+from finance.engine import calculate_schedule_vectorized
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+pa = lazy_import("pyarrow")
+
+# ==========================================
+# HTTP PRICING SERVICE
+# ==========================================
+# POST /schedule takes the inputs of calculate_schedule as JSON, POST /batch a deal table in the
+# finance.batch layout. Pricing runs on a process pool; the event loop only parses and coalesces
+# identical in-flight requests onto one job. The priced frame comes back whole, and each response
+# encodes it CHUNK_ROWS at a time as it is sent, so no full encoded body is ever held.
+#   python -m finance.service --port 8765 --workers 4
+#   curl -X POST 'localhost:8765/schedule?format=ndjson' -d @deal.json
+FORMATS = {
+    "json": "application/json",
+    "ndjson": "application/x-ndjson",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+CHUNK_ROWS = 5000
+STREAM_BYTES = 1 << 20
+
+
+class RequestError(ValueError):
+    pass
+
+
+# --- REQUEST PARSING (EVENT LOOP) ---
+def _number(body, name, default=None):
+    val = body.get(name, default)
+    if val is None:
+        raise RequestError(f"'{name}' is required")
+    try:
+        return float(val)
+    except (TypeError, ValueError):
+        raise RequestError(f"'{name}' must be a number")
+
+
+def _date(body, name="start_date"):
+    val = body.get(name)
+    if not val:
+        raise RequestError(f"'{name}' is required")
+    try:
+        return pd.Timestamp(val).strftime('%Y-%m-%d')
+    except (TypeError, ValueError):
+        raise RequestError(f"'{name}' must be an ISO date")
+
+
+def _phases(val, where="phases"):
+    if not isinstance(val, list) or not val or not all(isinstance(r, dict) for r in val):
+        raise RequestError(f"'{where}' must be a non-empty list of phase rows")
+    return grid_records(val)
+
+
+def _conventions(body):
+    # Optional {"anchor", "roll", "calendar", "day_count"}; see finance.dates
+    val = body.get("conventions") or {}
+    if not isinstance(val, dict):
+        raise RequestError("'conventions' must be an object")
+    choices = {"anchor": ANCHORS, "roll": ROLLS, "calendar": CALENDARS, "day_count": DAY_COUNTS}
+    defaults = {"anchor": "legacy", "roll": "none", "calendar": "NONE", "day_count": "flat"}
+    for name, value in val.items():
+        if name not in choices or value not in choices[name]:
+            raise RequestError(f"unknown convention {name}={value!r}")
+    return make_conventions(**{**defaults, **val})
+
+
+def parse_schedule(body):
+    # Normalized inputs double as the coalescing key, so 5 and 5.0 hit the same job
+    return {
+        "price": _number(body, "price"),
+        "down_payment": _number(body, "down_payment", 0.0),
+        "discount_rate": _number(body, "discount_rate", 0.0),
+        "start_date": _date(body),
+        "phases": _phases(body.get("phases")),
+        "conventions": _conventions(body),
+    }
+
+
+def parse_batch(body):
+    deals = body.get("deals")
+    if not isinstance(deals, list) or not deals:
+        raise RequestError("'deals' must be a non-empty list")
+    grids = body.get("grids") or {}
+    if not isinstance(grids, dict):
+        raise RequestError("'grids' must map grid_id to phase rows")
+    grids = {str(k): _phases(v, f"grids.{k}") for k, v in grids.items()}
+    parsed = []
+    for i, deal in enumerate(deals):
+        if not isinstance(deal, dict):
+            raise RequestError(f"deal {i} must be an object")
+        row = {
+            "deal_id": deal.get("deal_id", i),
+            "price": _number(deal, "price"),
+            "down_payment": _number(deal, "down_payment", 0.0),
+            "discount_rate": _number(deal, "discount_rate", 0.0),
+            "start_date": _date(deal),
+        }
+        if deal.get("phases") is not None:
+            row["phases"] = json.dumps(_phases(deal["phases"], f"deals.{i}.phases"), default=str)
+        elif str(deal.get("grid_id")) in grids:
+            row["grid_id"] = str(deal["grid_id"])
+        else:
+            raise RequestError(f"deal {i} needs 'phases' or a known 'grid_id'")
+        parsed.append(row)
+    return {"deals": parsed, "grids": grids, "schedules": bool(body.get("schedules", False)),
+            "conventions": _conventions(body)}
+
+
+def request_key(endpoint, fmt, inputs):
+    payload = json.dumps([endpoint, fmt, inputs], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+# --- ENCODERS (RESPONSE THREADS) ---
+# Generators over a priced frame: Starlette pulls them on its threadpool one chunk at a time, and
+# coalesced requests each encode the shared frame without modifying it.
+def _wire_frame(df):
+    out = df.copy()
+    out["Payment Date"] = pd.to_datetime(out["Payment Date"]).dt.strftime('%Y-%m-%d')
+    return out
+
+
+def encode_ndjson(header_rows, df, chunk_rows=CHUNK_ROWS):
+    yield ("".join(json.dumps(r) + "\n" for r in header_rows)).encode()
+    if df is not None and len(df):
+        for start in range(0, len(df), chunk_rows):
+            chunk = _wire_frame(df.iloc[start:start + chunk_rows])
+            chunk.insert(0, "record", "payment")
+            yield chunk.to_json(orient="records", lines=True).rstrip("\n").encode() + b"\n"
+
+
+class _ChunkSink:
+    # File-like target for the Arrow IPC writer; drained after every batch
+    closed = False
+
+    def __init__(self):
+        self.parts = []
+
+    def write(self, data):
+        self.parts.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data, self.parts = b"".join(self.parts), []
+        return data
+
+
+def encode_arrow(df, metadata, chunk_rows=CHUNK_ROWS):
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), b"totals": json.dumps(metadata).encode()})
+    sink = _ChunkSink()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        for batch in table.to_batches(max_chunksize=chunk_rows):
+            writer.write_batch(batch)
+            yield sink.drain()
+    yield sink.drain()
+
+
+def encode_json(payload, df=None, key=None, chunk_rows=CHUNK_ROWS):
+    # `payload` with the frame's records streamed in as a list under `key`
+    if df is None:
+        yield json.dumps(payload).encode()
+        return
+    yield (json.dumps(payload)[:-1] + (", " if payload else "") + json.dumps(key) + ": [").encode()
+    for start in range(0, len(df), chunk_rows):
+        records = _wire_frame(df.iloc[start:start + chunk_rows]).to_json(orient="records")[1:-1]
+        yield ((", " if start else "") + records).encode()
+    yield b"]}"
+
+
+ENCODERS = {"json": encode_json, "ndjson": encode_ndjson, "arrow": encode_arrow}
+
+
+# --- JOBS (WORKER PROCESSES) ---
+# Each returns (summary, encoder args): the encoder for the request's format runs on the response side
+def schedule_job(inputs, fmt):
+    df, t_paid, t_int, npv = calculate_schedule_vectorized(
+        inputs["price"], inputs["down_payment"], inputs["discount_rate"],
+        phases_frame(inputs["phases"]), inputs["start_date"], inputs["conventions"]
+    )
+    totals = {"total_cost": float(t_paid), "total_interest": float(t_int), "npv": float(npv), "payments": len(df)}
+    if fmt == "ndjson":
+        return totals, ([{"record": "totals", **totals}], df)
+    if fmt == "arrow":
+        return totals, (df, totals)
+    return totals, (totals, df, "schedule")
+
+
+def batch_job(inputs, fmt):
+    deals = pd.DataFrame(inputs["deals"])
+    totals, schedules = run_batch(deals, inputs["grids"], with_schedules=inputs["schedules"], workers=1,
+                                  conventions=inputs["conventions"])
+    totals.insert(0, "deal_id", deals["deal_id"].to_numpy())
+    records = json.loads(totals.to_json(orient="records"))
+    if schedules is not None:
+        schedules["deal"] = deals["deal_id"].to_numpy()[deals.index.get_indexer(schedules["deal"])]
+    summary = {"deals": len(deals), "payments": int(totals["payments"].sum())}
+    if fmt == "ndjson":
+        return summary, ([{"record": "totals", **r} for r in records], schedules)
+    if fmt == "arrow":
+        if schedules is not None:
+            return summary, (schedules, {"totals": records})
+        return summary, (totals, summary)
+    return summary, ({"totals": records}, schedules, "schedules")
+
+
+def _warm_worker():
+    # Pay the numpy/pandas/pyarrow import once per worker instead of on the first request
+    np.zeros(1), pd.Timestamp(0), pa.schema([])
+
+
+# --- SERVICE ---
+class Busy(RuntimeError):
+    pass
+
+
+class PricingService:
+    def __init__(self, workers=None, max_pending=256):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending
+        self.stats = Counter()
+        self._pool = None
+        self._inflight = {}
+
+    def start(self):
+        # spawn, not fork: the server process has an event loop and threads running
+        self._pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"),
+                                         initializer=_warm_worker)
+        self._pool.submit(_warm_worker)
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+    async def run(self, key, fn, *args):
+        self.stats["requests"] += 1
+        future = self._inflight.get(key)
+        if future is not None:
+            self.stats["coalesced"] += 1
+        else:
+            if len(self._inflight) >= self.max_pending:
+                self.stats["rejected"] += 1
+                raise Busy()
+            self.stats["computed"] += 1
+            future = asyncio.get_running_loop().run_in_executor(self._pool, fn, *args)
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # shield: one client hanging up must not cancel a job other requests are waiting on
+        return await asyncio.shield(future)
+
+    def health(self):
+        return {"status": "ok", "workers": self.workers, "inflight": len(self._inflight), **self.stats}
+
+
+def response_format(request):
+    fmt = request.query_params.get("format")
+    if fmt is None:
+        accept = request.headers.get("accept", "")
+        fmt = next((name for name, mime in FORMATS.items() if mime in accept), "json")
+    if fmt not in FORMATS:
+        raise RequestError(f"format must be one of {', '.join(FORMATS)}")
+    return fmt
+
+
+def _stream(chunks):
+    for chunk in chunks:
+        view = memoryview(chunk)
+        for start in range(0, len(view), STREAM_BYTES):
+            yield bytes(view[start:start + STREAM_BYTES])
+
+
+def create_app(service):
+    async def handle(request, parse, job, endpoint):
+        try:
+            fmt = response_format(request)
+            try:
+                body = await request.json()
+            except ValueError:
+                raise RequestError("body must be JSON")
+            if not isinstance(body, dict):
+                raise RequestError("body must be a JSON object")
+            inputs = parse(body)
+        except RequestError as e:
+            return JSONResponse({"error": str(e)}, status_code=400)
+        try:
+            summary, parts = await service.run(request_key(endpoint, fmt, inputs), job, inputs, fmt)
+        except Busy:
+            return JSONResponse({"error": "too many pending requests"}, status_code=503)
+        except (KeyError, TypeError, ValueError) as e:
+            return JSONResponse({"error": f"could not price request: {e}"}, status_code=422)
+        headers = {f"X-{k.replace('_', '-').title()}": str(v) for k, v in summary.items()}
+        return StreamingResponse(_stream(ENCODERS[fmt](*parts)), media_type=FORMATS[fmt], headers=headers)
+
+    async def schedule(request):
+        return await handle(request, parse_schedule, schedule_job, "schedule")
+
+    async def batch(request):
+        return await handle(request, parse_batch, batch_job, "batch")
+
+    async def health(request):
+        return JSONResponse(service.health())
+
+    @asynccontextmanager
+    async def lifespan(app):
+        service.start()
+        try:
+            yield
+        finally:
+            service.shutdown()
+
+    return Starlette(routes=[
+        Route("/schedule", schedule, methods=["POST"]),
+        Route("/batch", batch, methods=["POST"]),
+        Route("/health", health, methods=["GET"]),
+    ], lifespan=lifespan)
+
+
+def main(argv=None):
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Serve the calculation engine over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=None, help="Pricing processes (default: CPU count)")
+    parser.add_argument("--max-pending", type=int, default=256, help="Distinct in-flight jobs before answering 503")
+    args = parser.parse_args(argv)
+    uvicorn.run(create_app(PricingService(args.workers, args.max_pending)), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
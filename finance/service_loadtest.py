@@ -0,0 +1,174 @@
+import argparse
+import asyncio
+import json
+import socket
+import subprocess
+import sys
+import time
+from collections import Counter
+from urllib.parse import urlsplit
+import numpy as np
+
+# ==========================================
+# PRICING SERVICE LOAD GENERATOR
+# ==========================================
+# Fires POST requests at a running finance.service (or one it starts itself with --serve) from
+# C concurrent connections and reports throughput plus latency percentiles. --duplicates sends
+# part of the traffic as repeats of a few payloads so request coalescing shows up in the numbers.
+
+
+def make_payload(i, years=30, frequency="Monthly", price=1_000_000.0):
+    return {
+        "price": price + 1000 * i, "down_payment": 200_000.0, "discount_rate": 5.0, "start_date": "2025-01-01",
+        "phases": [
+            {"Frequency": "Specific Date", "Target Date": "2025-06-15", "Payment %": 10.0, "Interest Rate %": 5.0},
+            {"Frequency": frequency, "Years": years, "Interest Rate %": 5.0},
+        ],
+    }
+
+
+def make_batch_payload(i, deals=100, years=30, frequency="Monthly"):
+    grid = make_payload(0, years, frequency)["phases"]
+    return {
+        "grids": {"A": grid},
+        "deals": [{"deal_id": f"{i}-{d}", "grid_id": "A", "price": 500_000.0 + 1000 * (i * deals + d),
+                   "down_payment": 100_000.0, "discount_rate": 5.0, "start_date": "2025-01-01"} for d in range(deals)],
+    }
+
+
+async def post(host, port, path, body):
+    # One request per connection (Connection: close) and read to EOF; returns (status, ttfb, total, bytes)
+    t0 = time.perf_counter()
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(
+        f"POST {path} HTTP/1.1\r\nHost: {host}:{port}\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body
+    )
+    await writer.drain()
+    status_line = await reader.readline()
+    ttfb = time.perf_counter() - t0
+    received = len(status_line)
+    while True:
+        chunk = await reader.read(1 << 16)
+        if not chunk:
+            break
+        received += len(chunk)
+    writer.close()
+    await writer.wait_closed()
+    return int(status_line.split()[1]), ttfb, time.perf_counter() - t0, received
+
+
+async def get_json(host, port, path):
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}:{port}\r\nConnection: close\r\n\r\n".encode())
+    await writer.drain()
+    raw = await reader.read()
+    writer.close()
+    return json.loads(raw.split(b"\r\n\r\n", 1)[1])
+
+
+async def run_load_test(url, requests=500, concurrency=32, endpoint="schedule", fmt="json",
+                        duplicates=0.5, years=30, frequency="Monthly", batch_deals=100, seed=0):
+    parts = urlsplit(url)
+    host, port = parts.hostname, parts.port or 80
+    path = f"/{endpoint}?format={fmt}"
+
+    rng = np.random.default_rng(seed)
+    hot = rng.random(requests) < duplicates
+    ids = np.where(hot, rng.integers(0, 4, requests), np.arange(4, requests + 4))
+    build = make_batch_payload if endpoint == "batch" else make_payload
+    extra = {"deals": batch_deals} if endpoint == "batch" else {}
+    bodies = {i: json.dumps(build(int(i), years=years, frequency=frequency, **extra)).encode() for i in np.unique(ids)}
+
+    before = await get_json(host, port, "/health")
+    queue = asyncio.Queue()
+    for i in ids:
+        queue.put_nowait(bodies[i])
+    results = []
+
+    async def client():
+        while True:
+            try:
+                body = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            try:
+                results.append(await post(host, port, path, body))
+            except OSError:
+                results.append((0, float("nan"), float("nan"), 0))
+
+    t_start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - t_start
+    after = await get_json(host, port, "/health")
+
+    status = np.array([r[0] for r in results])
+    ok = status == 200
+    lat = np.array([r[2] for r in results])[ok] * 1000
+    ttfb = np.array([r[1] for r in results])[ok] * 1000
+    pct = lambda a, q: float(np.percentile(a, q)) if a.size else float("nan")
+    return {
+        "requests": len(results), "seconds": elapsed, "requests_per_sec": len(results) / elapsed,
+        "p50_ms": pct(lat, 50), "p95_ms": pct(lat, 95), "p99_ms": pct(lat, 99), "max_ms": float(lat.max()) if lat.size else float("nan"),
+        "ttfb_p50_ms": pct(ttfb, 50), "mb_received": sum(r[3] for r in results) / 1e6,
+        "status": dict(Counter(int(s) for s in status)),
+        "coalesced": after.get("coalesced", 0) - before.get("coalesced", 0),
+        "computed": after.get("computed", 0) - before.get("computed", 0),
+    }
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def serve(workers=None, timeout=60.0):
+    # Starts `python -m finance.service` on a free local port and waits for /health
+    port = _free_port()
+    cmd = [sys.executable, "-m", "finance.service", "--port", str(port)]
+    if workers:
+        cmd += ["--workers", str(workers)]
+    proc = subprocess.Popen(cmd)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            asyncio.run(get_json("127.0.0.1", port, "/health"))
+            return proc, f"http://127.0.0.1:{port}"
+        except OSError:
+            time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError("pricing service did not start")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test the HTTP pricing service.")
+    parser.add_argument("--url", default="http://127.0.0.1:8765", help="Service to target (ignored with --serve)")
+    parser.add_argument("--serve", action="store_true", help="Start a local service for the duration of the test")
+    parser.add_argument("--workers", type=int, default=None, help="Pricing processes for --serve")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--endpoint", choices=["schedule", "batch"], default="schedule")
+    parser.add_argument("--format", choices=["json", "ndjson", "arrow"], default="json")
+    parser.add_argument("--duplicates", type=float, default=0.5, help="Share of requests repeating one of 4 hot payloads")
+    parser.add_argument("--years", type=float, default=30, help="Length of the amortizing phase")
+    parser.add_argument("--frequency", default="Monthly")
+    parser.add_argument("--batch-deals", type=int, default=100, help="Deals per /batch request")
+    args = parser.parse_args(argv)
+
+    proc, url = serve(args.workers) if args.serve else (None, args.url)
+    try:
+        r = asyncio.run(run_load_test(url, args.requests, args.concurrency, args.endpoint, args.format,
+                                      args.duplicates, args.years, args.frequency, args.batch_deals))
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait()
+    print(f"{r['requests']} requests ({args.endpoint}, {args.format}) in {r['seconds']:.2f}s at concurrency {args.concurrency}")
+    print(f"throughput: {r['requests_per_sec']:.1f} req/s | {r['mb_received']:.1f} MB received")
+    print(f"latency ms: p50 {r['p50_ms']:.0f} | p95 {r['p95_ms']:.0f} | p99 {r['p99_ms']:.0f} | max {r['max_ms']:.0f} | ttfb p50 {r['ttfb_p50_ms']:.0f}")
+    print(f"status: {r['status']} | jobs computed {r['computed']} | coalesced {r['coalesced']}")
+
+
+if __name__ == "__main__":
+    main()
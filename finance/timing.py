@@ -0,0 +1,159 @@
+import atexit
+import contextvars
+import functools
+import io
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+# ==========================================
+# TIMING SPANS & PROFILING
+# ==========================================
+# span() is a no-op unless a rerun has activated collectors, so the engine can carry spans
+# permanently. Each collector keeps a rolling window per span name; the process-wide one also
+# logs every span to a JSON-lines file. Log lines go through a queue to one background writer
+# thread, so a span never waits on disk, and the file rotates at LOG_MAX_BYTES.
+DEFAULT_LOG_PATH = os.environ.get("TIMING_LOG_PATH", os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "timings.jsonl"))
+WINDOW = 500
+LOG_MAX_BYTES = 10 * 1024 * 1024
+LOG_BACKUPS = 3
+
+_collectors = contextvars.ContextVar("timing_collectors", default=())
+_fields = contextvars.ContextVar("timing_fields", default={})
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    pos = (len(ordered) - 1) * q / 100
+    lo = int(pos)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (pos - lo)
+
+
+_log_lock = threading.Lock()
+
+
+def span_logger(log_path, max_bytes=LOG_MAX_BYTES, backups=LOG_BACKUPS):
+    # One logger per file, fed through a queue and written by a QueueListener thread into a
+    # RotatingFileHandler; the listener is stopped (and the queue drained) at exit
+    logger = logging.getLogger(f"finance.timing.{os.path.abspath(log_path)}")
+    with _log_lock:
+        if not logger.handlers:
+            os.makedirs(os.path.dirname(os.path.abspath(log_path)), exist_ok=True)
+            lines = queue.SimpleQueue()
+            handler = logging.handlers.RotatingFileHandler(log_path, maxBytes=max_bytes, backupCount=backups)
+            listener = logging.handlers.QueueListener(lines, handler)
+            listener.start()
+            atexit.register(listener.stop)
+            logger.addHandler(logging.handlers.QueueHandler(lines))
+            logger.setLevel(logging.INFO)
+            logger.propagate = False
+    return logger
+
+
+class SpanStats:
+    def __init__(self, window=WINDOW, log_path=None):
+        self.window = window
+        self.log_path = log_path
+        self._spans = defaultdict(lambda: deque(maxlen=self.window))
+        self._lock = threading.Lock()
+        self._logger = span_logger(log_path) if log_path else None
+
+    def record(self, name, seconds, **fields):
+        with self._lock:
+            self._spans[name].append(seconds)
+        if self._logger is not None:
+            self._logger.info(json.dumps({"ts": time.time(), "span": name, "ms": round(seconds * 1000, 3), **fields}, default=str))
+
+    def summary(self):
+        # {name: {"count", "p50_ms", "p95_ms", "last_ms"}} over the rolling window
+        with self._lock:
+            spans = {name: list(values) for name, values in self._spans.items()}
+        return {
+            name: {"count": len(v), "p50_ms": percentile(v, 50) * 1000, "p95_ms": percentile(v, 95) * 1000, "last_ms": v[-1] * 1000}
+            for name, v in sorted(spans.items()) if v
+        }
+
+    def clear(self):
+        with self._lock:
+            self._spans.clear()
+
+
+def activate(*collectors, **fields):
+    # Routes spans in the current context (this rerun) to the given collectors
+    _collectors.set(tuple(c for c in collectors if c is not None))
+    _fields.set(fields)
+
+
+def record(name, seconds, **fields):
+    merged = {**_fields.get(), **fields}
+    for collector in _collectors.get():
+        collector.record(name, seconds, **merged)
+
+
+@contextmanager
+def span(name, **fields):
+    if not _collectors.get():
+        yield
+        return
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - t0, **fields)
+
+
+def timed(name):
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+# --- SINGLE-RERUN PROFILES ---
+class Profile:
+    # pyinstrument (HTML) when it is installed, cProfile (pstats text) otherwise
+    def __init__(self):
+        try:
+            from pyinstrument import Profiler
+            self._profiler, self.kind = Profiler(), "pyinstrument"
+        except ImportError:
+            import cProfile
+            self._profiler, self.kind = cProfile.Profile(), "cprofile"
+        self.running = False
+
+    def start(self):
+        if self.kind == "pyinstrument":
+            self._profiler.start()
+        else:
+            self._profiler.enable()
+        self.running = True
+
+    def stop(self):
+        if self.running:
+            if self.kind == "pyinstrument":
+                self._profiler.stop()
+            else:
+                self._profiler.disable()
+            self.running = False
+
+    def export(self):
+        # (bytes, file_name, mime)
+        self.stop()
+        if self.kind == "pyinstrument":
+            return self._profiler.output_html().encode("utf-8"), "profile.html", "text/html"
+        import pstats
+        out = io.StringIO()
+        pstats.Stats(self._profiler, stream=out).sort_stats("cumulative").print_stats(60)
+        return out.getvalue().encode("utf-8"), "profile.txt", "text/plain"
@@ -0,0 +1,160 @@
+import os
+import sqlite3
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from contextlib import contextmanager
+
+from finance._lazy import lazy_import
+
+bcrypt = lazy_import("bcrypt")
+pd = lazy_import("pandas")
+
+# ==========================================
+# USER STORE & LOGIN SERVICE
+# ==========================================
+# Password hashes are computed once (at signup, or ahead of time for the seeded demo users) and
+# kept in SQLite; the process loads them into memory once. bcrypt itself only ever runs on a
+# bounded worker pool, never on a Streamlit script thread, and each username is rate limited.
+DEFAULT_DB_PATH = os.environ.get("USER_DB_PATH", os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "users.sqlite3"))
+
+# Precomputed bcrypt hashes for the demo accounts ('abc' and 'def')
+SEED_USERS = {
+    'jsmith': {'name': 'John Smith', 'password': '$2b$12$ieSp6X.i5gWIbTSuKKZ00OdB8S0MrFmLtTvsAIZQM8w/a9bNmTTk2'},
+    'rbriggs': {'name': 'Rebecca Briggs', 'password': '$2b$12$E8VEwOjeJ.rLoDFjNMoyZO9E3hCkzAIVRzryWYRCXhPF0g.qLHZmq'},
+}
+# Usernames that see the admin-only panels (comma separated). Empty unless set: the demo
+# accounts' passwords are public, so none of them may be an admin by default.
+ADMIN_USERS = {u.strip() for u in os.environ.get("ADMIN_USERS", "").split(",") if u.strip()}
+# Unknown usernames are checked against this so they cost the same as a wrong password
+DUMMY_HASH = SEED_USERS['jsmith']['password']
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    username TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    password TEXT NOT NULL,
+    created_at TEXT NOT NULL
+);
+"""
+
+
+def hash_pass(password):
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
+
+
+def check_pass(password, password_hash):
+    return bcrypt.checkpw(password.encode(), password_hash.encode())
+
+
+class UserStore:
+    def __init__(self, path=DEFAULT_DB_PATH, seed=SEED_USERS):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+            conn.executemany(
+                "INSERT OR IGNORE INTO users (username, name, password, created_at) VALUES (?, ?, ?, ?)",
+                [(u, v['name'], v['password'], pd.Timestamp.now().isoformat()) for u, v in seed.items()],
+            )
+            rows = conn.execute("SELECT username, name, password FROM users").fetchall()
+        self._users = {u: {'name': n, 'password': p} for u, n, p in rows}
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def __contains__(self, username):
+        return username in self._users
+
+    def get(self, username):
+        return self._users.get(username)
+
+    def credentials(self):
+        # A fresh copy per caller: streamlit_authenticator writes per-session flags into it
+        with self._lock:
+            return {'usernames': {u: dict(v) for u, v in self._users.items()}}
+
+    def add(self, username, name, password_hash):
+        with self._lock:
+            if username in self._users:
+                return False
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT INTO users (username, name, password, created_at) VALUES (?, ?, ?, ?)",
+                    (username, name, password_hash, pd.Timestamp.now().isoformat()),
+                )
+            self._users[username] = {'name': name, 'password': password_hash}
+            return True
+
+
+class RateLimiter:
+    # Sliding window of attempt timestamps per key
+    def __init__(self, max_attempts=5, window_seconds=60.0):
+        self.max_attempts = max_attempts
+        self.window_seconds = window_seconds
+        self._attempts = defaultdict(deque)
+        self._lock = threading.Lock()
+
+    def allow(self, key, now=None):
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            attempts = self._attempts[key]
+            while attempts and now - attempts[0] > self.window_seconds:
+                attempts.popleft()
+            if len(attempts) >= self.max_attempts:
+                return False
+            attempts.append(now)
+            return True
+
+    def reset(self, key):
+        with self._lock:
+            self._attempts.pop(key, None)
+
+
+class LoginService:
+    # Outcomes: "ok", "invalid", "rate_limited" or "busy" (queue full or timed out)
+    def __init__(self, store, max_workers=None, max_queue=64, limiter=None):
+        self.store = store
+        self.limiter = limiter or RateLimiter()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers or min(4, os.cpu_count() or 1), thread_name_prefix="bcrypt")
+        self._slots = threading.BoundedSemaphore(max_queue)
+
+    def _submit(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            return None
+        future = self._pool.submit(fn, *args)
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def verify(self, username, password, timeout=10.0):
+        if not self.limiter.allow(username):
+            return "rate_limited"
+        user = self.store.get(username)
+        future = self._submit(check_pass, password, user['password'] if user else DUMMY_HASH)
+        if future is None:
+            return "busy"
+        try:
+            valid = future.result(timeout=timeout)
+        except FutureTimeout:
+            return "busy"
+        if valid and user:
+            self.limiter.reset(username)
+            return "ok"
+        return "invalid"
+
+    def register(self, username, name, password, timeout=10.0):
+        future = self._submit(hash_pass, password)
+        if future is None:
+            return False
+        try:
+            return self.store.add(username, name, future.result(timeout=timeout))
+        except FutureTimeout:
+            return False
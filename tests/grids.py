@@ -0,0 +1,45 @@
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from finance.engine import FREQ_MAP
+
+# Random payment grids for the engine tests: standard phases of every frequency (computed,
+# Payment % or Fixed Payment) mixed with Specific Date phases, some dated before the previous one.
+FREQUENCIES = [f for f in FREQ_MAP if f != 'Specific Date']
+START = date(2025, 1, 1)
+
+
+def random_row(rng, target):
+    if rng.random() < 0.3:
+        return {"Years": 0.0, "Frequency": "Specific Date", "Target Date": target,
+                "Payment %": float(rng.choice([0.0, 5.0, 10.0])), "Fixed Payment": 0.0,
+                "Interest Rate %": float(rng.choice([0.0, 3.0, 7.5]))}
+    kind = rng.integers(3)
+    return {"Years": float(rng.choice([1.0, 2.0, 3.25, 5.0])), "Frequency": str(rng.choice(FREQUENCIES)),
+            "Target Date": None,
+            "Payment %": float(rng.choice([0.5, 1.0, 2.0])) if kind == 1 else 0.0,
+            "Fixed Payment": float(rng.choice([1000.0, 5000.0, 20000.0])) if kind == 2 else 0.0,
+            "Interest Rate %": float(rng.choice([0.0, 3.0, 7.5]))}
+
+
+def random_grid(rng, n_rows):
+    rows, target = [], START
+    for _ in range(n_rows):
+        target = target + timedelta(days=int(rng.integers(-30, 400)))
+        rows.append(random_row(rng, target))
+    return pd.DataFrame(rows)
+
+
+def assert_same_result(a, b):
+    # Schedules and totals equal to the cent
+    df_a, df_b = a[0].reset_index(drop=True), b[0].reset_index(drop=True)
+    assert len(df_a) == len(df_b)
+    if len(df_a):
+        assert (df_a["Phase"].astype(str) == df_b["Phase"].astype(str)).all()
+        assert (pd.to_datetime(df_a["Payment Date"]) == pd.to_datetime(df_b["Payment Date"])).all()
+        for col in ["Payment", "Interest", "Principal", "Balance"]:
+            np.testing.assert_allclose(df_a[col].to_numpy(float), df_b[col].to_numpy(float), rtol=0, atol=0.005)
+    for x, y in zip(a[1:], b[1:]):
+        assert abs(float(x) - float(y)) < 0.005
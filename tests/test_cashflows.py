@@ -0,0 +1,52 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from finance.cashflows import accrual_times, schedule_metrics
+from finance.engine import calculate_schedule_vectorized
+from finance.scenarios import ScenarioStore
+
+PRICE, DOWN = 1_000_000.0, 200_000.0
+# A 5% plan: deposit and installment on fixed dates, then three years of monthly payments
+GRID = pd.DataFrame([
+    {"Years": 0.0, "Frequency": "Specific Date", "Target Date": date(2025, 6, 15), "Payment %": 10.0, "Fixed Payment": 0.0, "Interest Rate %": 5.0},
+    {"Years": 0.0, "Frequency": "Specific Date", "Target Date": date(2025, 12, 15), "Payment %": 5.0, "Fixed Payment": 0.0, "Interest Rate %": 5.0},
+    {"Years": 3.0, "Frequency": "Monthly", "Target Date": None, "Payment %": 0.0, "Fixed Payment": 0.0, "Interest Rate %": 5.0},
+])
+
+
+def metrics(start):
+    df = calculate_schedule_vectorized(PRICE, DOWN, 5.0, GRID, start)[0]
+    (xnpv,), (xirr,) = schedule_metrics([df], [PRICE], [DOWN], [5.0], [start])
+    return df, xnpv, xirr
+
+
+def test_accrual_times_only_count_forward_gaps():
+    dates = np.array(["2026-01-01", "2025-06-15", "2025-12-15", "2025-11-01", "2025-12-01"], dtype="datetime64[D]")
+    np.testing.assert_allclose(accrual_times(dates, date(2026, 1, 1)) * 365, [0, 0, 183, 183, 213])
+
+
+@pytest.mark.parametrize("start", [date(2025, 1, 1), date(2025, 9, 1), date(2026, 10, 17)])
+def test_past_dated_specific_date_keeps_the_plan_rate(start):
+    # Started after the deposit (and after the installment) the engine still charges 5% between
+    # the payments, so the cost of the financing must stay near 5% effective, not jump
+    _, xnpv, xirr = metrics(start)
+    assert xirr == pytest.approx(0.0512, abs=0.0005)
+    assert xnpv == pytest.approx(metrics(date(2025, 1, 1))[1], rel=0.01)
+
+
+def test_store_clears_metrics_from_older_versions(tmp_path):
+    path = str(tmp_path / "scenarios.sqlite3")
+    store = ScenarioStore(path)
+    df, _, xirr = metrics(date(2026, 10, 17))
+    inputs = {"price": PRICE, "down_payment": DOWN, "discount_rate": 5.0, "start_date": date(2026, 10, 17)}
+    sid = store.save("u", "plan", 1.0, 1.0, 1.0, "USD", "$", inputs, GRID, df, xnpv=-1.0, xirr=0.1456)
+    with store._connect() as conn:
+        conn.execute("PRAGMA user_version = 0")
+
+    store = ScenarioStore(path)
+    assert store.list("u")["xnpv"].isna().all()
+    assert store.backfill_metrics("u", [sid]) == 1
+    assert store.list("u").loc[0, "xirr"] == pytest.approx(xirr)
@@ -0,0 +1,16 @@
+import numpy as np
+import pytest
+
+from finance.engine import calculate_schedule, calculate_schedule_vectorized
+from grids import START, assert_same_result, random_grid
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_vectorized_matches_reference(seed):
+    rng = np.random.default_rng(seed)
+    for _ in range(10):
+        grid = random_grid(rng, int(rng.integers(1, 5)))
+        price = float(rng.choice([250_000.0, 1_000_000.0]))
+        down = price * float(rng.choice([0.0, 0.1, 0.3]))
+        assert_same_result(calculate_schedule(price, down, 5.0, grid, START),
+                           calculate_schedule_vectorized(price, down, 5.0, grid, START))
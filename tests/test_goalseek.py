@@ -0,0 +1,80 @@
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from finance.cache import ResultCache
+from finance.engine import calculate_schedule_vectorized
+from finance.goalseek import apply_variable, goal_seek, schedule_metric
+
+START = date(2025, 1, 1)
+PRICE, DOWN = 1_000_000.0, 200_000.0
+
+
+def two_phase_grid():
+    # Row 0 pays a share of the price for 2 years, row 1 amortizes the rest over 3: the recurring
+    # payment falls and then rises with row 0's Payment % (26,417 at 0.01, 18,944 at 1, 30,000 at 3)
+    return pd.DataFrame([
+        {"Years": 2.0, "Frequency": "Monthly", "Target Date": None, "Payment %": 0.5, "Fixed Payment": 0.0, "Interest Rate %": 5.0},
+        {"Years": 3.0, "Frequency": "Monthly", "Target Date": None, "Payment %": 0.0, "Fixed Payment": 0.0, "Interest Rate %": 5.0},
+    ])
+
+
+def recurring_payment(variable, value, grid):
+    grid, down = apply_variable(variable, value, grid, DOWN, 0)
+    return schedule_metric("Recurring Payment", *calculate_schedule_vectorized(PRICE, down, 5.0, grid, START), grid)
+
+
+@pytest.mark.parametrize("target", [18_000.0, 20_000.0, 25_000.0, 40_000.0])
+@pytest.mark.parametrize("variable", ["Payment %", "Fixed Payment"])
+def test_v_shaped_recurring_payment_is_solved(variable, target):
+    grid = two_phase_grid()
+    result = goal_seek(variable, "Recurring Payment", target, PRICE, DOWN, 5.0, grid, START, row_index=0)
+    assert result["status"] == "solved"
+    assert result["achieved"] == pytest.approx(target, abs=0.01)
+    assert recurring_payment(variable, result["value"], grid) == pytest.approx(target, abs=0.01)
+
+
+def test_v_shaped_target_below_the_bottom_reports_the_bottom():
+    grid = two_phase_grid()
+    result = goal_seek("Payment %", "Recurring Payment", 15_000.0, PRICE, DOWN, 5.0, grid, START, row_index=0)
+    assert result["status"] == "below_range"
+    low = min(recurring_payment("Payment %", x, grid) for x in (0.01, 0.5, 1.0, 1.5, 2.0, 3.0))
+    assert result["achieved"] <= low
+    assert result["range"][0] == pytest.approx(result["achieved"])
+
+
+def test_v_shaped_solution_stays_on_the_side_of_the_current_input():
+    grid = two_phase_grid()
+    grid.loc[0, "Payment %"] = 2.5
+    result = goal_seek("Payment %", "Recurring Payment", 20_000.0, PRICE, DOWN, 5.0, grid, START, row_index=0)
+    assert result["status"] == "solved"
+    assert result["value"] == pytest.approx(2.0, abs=1e-3)
+
+
+@pytest.mark.parametrize("target", [15_000.0, 20_000.0, 25_000.0, 40_000.0, 1e7])
+@pytest.mark.parametrize("current", [0.0, 0.5, 2.5])
+def test_v_shaped_solve_takes_a_handful_of_runs(current, target):
+    grid = two_phase_grid()
+    grid.loc[0, "Payment %"] = current
+    result = goal_seek("Payment %", "Recurring Payment", target, PRICE, DOWN, 5.0, grid, START, row_index=0)
+    assert result["evaluations"] <= 10
+
+
+def test_last_phase_payment_is_solved_as_monotone():
+    # Nothing after the last phase depends on its payment, so both bounds bracket the target
+    grid = two_phase_grid()
+    grid.loc[1, "Fixed Payment"] = 30_000.0
+    result = goal_seek("Fixed Payment", "Recurring Payment", 32_000.0, PRICE, DOWN, 5.0, grid, START, row_index=1)
+    assert result["status"] == "solved"
+    assert result["achieved"] == pytest.approx(32_000.0, abs=0.01)
+    assert result["evaluations"] <= 4
+
+
+def test_evaluations_share_the_result_cache_without_counting():
+    # The RESULT CACHE caption counts RUN ANALYSIS reuse only
+    cache = ResultCache()
+    goal_seek("Payment %", "Recurring Payment", 20_000.0, PRICE, DOWN, 5.0, two_phase_grid(), START, row_index=0, cache=cache)
+    stats = cache.stats()
+    assert stats["entries"] > 0
+    assert stats["hits"] == stats["misses"] == 0
@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from finance.dates import make_conventions
+from finance.engine import calculate_schedule, calculate_schedule_vectorized
+from finance.incremental import IncrementalSchedule
+from grids import START, assert_same_result, random_grid, random_row
+
+CONVENTIONS = make_conventions("day_of_month", "modified_following", "NONE", "ACT/365")
+
+
+def edit(rng, grid):
+    # One random edit as the data editor would make it: change a value, add a row or delete one.
+    # Deleted rows leave their index behind, so later grids have gaps (Phase labels follow the index).
+    grid = grid.copy()
+    kind = rng.choice(["value", "value", "insert", "delete"]) if len(grid) > 1 else rng.choice(["value", "insert"])
+    pos = grid.index[int(rng.integers(len(grid)))]
+    if kind == "value":
+        col = rng.choice(["Years", "Payment %", "Fixed Payment", "Interest Rate %"])
+        if grid.loc[pos, "Frequency"] == "Specific Date" and col == "Years":
+            col = "Payment %"
+        grid.loc[pos, col] = float(random_row(rng, START)[col])
+    elif kind == "insert":
+        target = pd.Timestamp(START) + pd.Timedelta(days=int(rng.integers(0, 2000)))
+        grid.loc[grid.index.max() + 1] = random_row(rng, target.date())
+    else:
+        grid = grid.drop(index=pos)
+    return grid
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_edit_sequence_matches_full_recompute(seed):
+    rng = np.random.default_rng(seed)
+    engine = IncrementalSchedule()
+    grid = random_grid(rng, 4)
+    reused = 0
+    for _ in range(15):
+        result = engine.calculate(1_000_000.0, 100_000.0, 5.0, grid, START)
+        reused += engine.recomputed_from > 0
+        assert_same_result(result, calculate_schedule(1_000_000.0, 100_000.0, 5.0, grid, START))
+        assert_same_result(result, calculate_schedule_vectorized(1_000_000.0, 100_000.0, 5.0, grid, START))
+        grid = edit(rng, grid)
+    assert reused  # the sequence exercised checkpoint reuse, not only full recomputes
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_edit_sequence_matches_full_recompute_with_conventions(seed):
+    rng = np.random.default_rng(100 + seed)
+    engine = IncrementalSchedule()
+    grid = random_grid(rng, 4)
+    for _ in range(10):
+        result = engine.calculate(1_000_000.0, 100_000.0, 5.0, grid, START, conventions=CONVENTIONS)
+        assert_same_result(result, calculate_schedule_vectorized(1_000_000.0, 100_000.0, 5.0, grid, START,
+                                                                 conventions=CONVENTIONS))
+        grid = edit(rng, grid)
+
+
+def test_inputs_change_recomputes_everything():
+    rng = np.random.default_rng(7)
+    engine = IncrementalSchedule()
+    grid = random_grid(rng, 4)
+    engine.calculate(1_000_000.0, 100_000.0, 5.0, grid, START)
+    result = engine.calculate(1_000_000.0, 250_000.0, 5.0, grid, START)
+    assert engine.recomputed_from == 0
+    assert_same_result(result, calculate_schedule(1_000_000.0, 250_000.0, 5.0, grid, START))
@@ -0,0 +1,41 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from finance.engine import SCHEDULE_COLUMNS, calculate_schedule_vectorized
+from finance.overlay import align_schedules
+
+START = date(2025, 1, 1)
+
+
+def schedule(years, frequency, down=100_000.0):
+    grid = pd.DataFrame([{"Years": years, "Frequency": frequency, "Target Date": None, "Payment %": 0.0,
+                          "Fixed Payment": 0.0, "Interest Rate %": 5.0}])
+    return calculate_schedule_vectorized(1_000_000.0, down, 5.0, grid, START)[0]
+
+
+def empty_schedule():
+    return pd.DataFrame(columns=SCHEDULE_COLUMNS).astype({"Payment Date": "datetime64[ns]", "Payment": float, "Balance": float})
+
+
+def test_views_match_each_schedule():
+    schedules = {"A": schedule(5.0, "Monthly"), "B": schedule(10.0, "Quarterly", down=300_000.0)}
+    views, freq = align_schedules(schedules, [900_000.0, 700_000.0], [100_000.0, 300_000.0], baseline="B")
+    assert freq == "M"
+    for label, down in (("A", 100_000.0), ("B", 300_000.0)):
+        df = schedules[label]
+        assert np.isclose(views["payments"][label].sum(), df["Payment"].sum())
+        assert np.isclose(views["cumulative"][label].iloc[-1], df["Payment"].sum() + down)
+        assert np.isclose(views["balance"][label].iloc[-1], df["Balance"].iloc[-1])
+    np.testing.assert_allclose(views["difference"]["A"], views["payments"]["A"] - views["payments"]["B"])
+
+
+def test_empty_schedules():
+    views, freq = align_schedules({"A": empty_schedule(), "B": empty_schedule()}, [0.0, 0.0], [1e6, 1e6])
+    assert freq == "M"
+    assert all(frame.shape == (0, 2) for frame in views.values())
+
+    views, _ = align_schedules({"A": schedule(5.0, "Monthly"), "B": empty_schedule()}, [900_000.0, 0.0], [100_000.0, 1e6])
+    assert (views["payments"]["B"] == 0).all()
+    assert (views["cumulative"]["B"] == 1e6).all()
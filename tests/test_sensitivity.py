@@ -0,0 +1,47 @@
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from finance import sensitivity
+from finance.batch import TOTAL_COLUMNS
+
+GRID = pd.DataFrame([
+    {"Years": 0.0, "Frequency": "Specific Date", "Target Date": date(2025, 6, 15), "Payment %": 10.0, "Fixed Payment": 0.0, "Interest Rate %": 5.0},
+    {"Years": 3.0, "Frequency": "Monthly", "Target Date": None, "Payment %": 0.0, "Fixed Payment": 0.0, "Interest Rate %": 5.0},
+])
+AXES = {"Term (Years)": np.arange(5.0, 30.0), "Interest Rate %": np.array([3.0, 5.0, 7.0])}
+
+
+class BrokenPool:
+    # Stands in for a pool whose worker died: the first block comes back, the rest break
+    def __init__(self):
+        self.submitted, self.shut_down = 0, False
+
+    def submit(self, fn, args):
+        future = Future()
+        if self.submitted == 0:
+            future.set_result(fn(args))
+        else:
+            future.set_exception(BrokenProcessPool("a child process terminated abruptly"))
+        self.submitted += 1
+        return future
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        self.shut_down = True
+
+
+def sweep(**kwargs):
+    return sensitivity.run_sweep(1_000_000.0, 200_000.0, 5.0, GRID, date(2025, 1, 1), AXES, **kwargs)
+
+
+def test_broken_pool_finishes_in_process_and_is_replaced(monkeypatch):
+    pool = BrokenPool()
+    monkeypatch.setattr(sensitivity, "_pool", pool)
+    results = sweep()
+    expected = sweep(workers=1)
+    for col in TOTAL_COLUMNS:
+        np.testing.assert_allclose(results[col], expected[col])
+    assert pool.shut_down and sensitivity._pool is None